@@ -3,14 +3,267 @@ AI Summary Module
 Generates financial insights using AI or rule-based fallback
 """
 
+import hashlib
+import io
 import os
-from typing import Dict, Optional, Tuple
-import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+try:
+    from anthropic import Anthropic as _Anthropic
+except ImportError:  # optional: rule-based summary is used without it
+    _Anthropic = None
+
+
+# Line-item groups shared by the summary builders
+OPEX_KEYS = ('distribution_expenses', 'marketing_admin', 'research_dev', 'depreciation_expense')
+NI_SUBTRACT_KEYS = OPEX_KEYS + ('interest_expense', 'tax_expense')
+CURRENT_ASSET_KEYS = ('cash', 'accounts_receivable', 'inventory', 'prepaid_expenses',
+                      'other_current_assets')
+PPE_KEYS = ('ppe_gross', 'accumulated_depreciation')
+LIAB_KEYS = ('accounts_payable', 'accrued_payroll', 'deferred_revenue', 'interest_payable',
+             'other_current_liabilities', 'income_taxes_payable', 'long_term_debt')
+EQUITY_KEYS = ('common_stock', 'retained_earnings')
+CFO_DELTA_KEYS = ('delta_ar', 'delta_inventory', 'delta_prepaid', 'delta_other_current_assets',
+                  'delta_ap', 'delta_accrued_payroll', 'delta_deferred_revenue',
+                  'delta_interest_payable', 'delta_other_current_liabilities',
+                  'delta_income_taxes_payable')
+CF_KEYS = ('capex', 'stock_issuance', 'dividends', 'delta_debt')
+
+SEVERITY_EMOJI = {
+    'Critical': '🔴',
+    'Warning': '🟡',
+    'Info': 'ℹ️'
+}
+
+# Every input line item read by the derivations (de-duplicated, order preserved)
+INPUT_KEYS = list(dict.fromkeys(
+    ('revenue', 'cogs') + NI_SUBTRACT_KEYS + CURRENT_ASSET_KEYS + PPE_KEYS +
+    LIAB_KEYS + EQUITY_KEYS + CFO_DELTA_KEYS + CF_KEYS
+))
+INPUT_COL = {key: i for i, key in enumerate(INPUT_KEYS)}
+_INPUT_GET = itemgetter(*INPUT_KEYS)
+_OPEX_GET = itemgetter(*OPEX_KEYS)
+_CURRENT_ASSET_GET = itemgetter(*CURRENT_ASSET_KEYS)
+_LIAB_GET = itemgetter(*LIAB_KEYS)
+_EQUITY_GET = itemgetter(*EQUITY_KEYS)
+_CFO_DELTA_GET = itemgetter(*CFO_DELTA_KEYS)
+
+# Below this many years the per-year scalar path beats building the matrix
+_MATRIX_MIN_YEARS = 10
+
+
+class _Derived(NamedTuple):
+    """Derived totals for a single year"""
+    revenue: float
+    gross_profit: float
+    opex: float
+    ebit: float
+    net_income: float
+    ppe_net: float
+    total_assets: float
+    total_liab: float
+    total_equity: float
+    cfo: float
+    cfi: float
+    cff: float
+    gross_margin: float
+    ebit_margin: float
+    net_margin: float
+
+
+class _ZeroDict(dict):
+    """Year dict whose missing line items read as 0.0"""
+    
+    def __missing__(self, key):
+        return 0.0
+
+
+def _sum_keys(d, keys) -> float:
+    """
+    Sum the given line items of a year dict (or column mapping), missing -> 0
+    
+    A plain loop avoids building an intermediate list per sum.
+    """
+    s = 0.0
+    get = d.get
+    for k in keys:
+        s = s + get(k, 0)
+    return s
+
+
+def _derive_matrix(X: np.ndarray) -> np.ndarray:
+    """
+    Compute derived totals for all years at once
+    
+    Args:
+        X: float64 matrix of shape (years, len(INPUT_KEYS)), columns in INPUT_KEYS order
+    
+    Returns:
+        float64 matrix of shape (years, len(_Derived._fields)), columns in field order
+    """
+    col = {key: X[:, i] for key, i in INPUT_COL.items()}  # column views, no copies
+    
+    revenue = col['revenue']
+    gross_profit = revenue - col['cogs']
+    opex = _sum_keys(col, OPEX_KEYS)
+    ebit = gross_profit - opex
+    net_income = ebit - col['interest_expense'] - col['tax_expense']
+    
+    ppe_net = col['ppe_gross'] - col['accumulated_depreciation']
+    total_assets = _sum_keys(col, CURRENT_ASSET_KEYS) + ppe_net
+    total_liab = _sum_keys(col, LIAB_KEYS)
+    total_equity = _sum_keys(col, EQUITY_KEYS)
+    
+    cfo = net_income + col['depreciation_expense'] + _sum_keys(col, CFO_DELTA_KEYS)
+    cfi = col['capex']
+    cff = col['stock_issuance'] - col['dividends'] + col['delta_debt']
+    
+    # Margins in %, 0 where there is no revenue (masked divide, no branches)
+    has_rev = revenue > 0
+    safe_rev = np.where(has_rev, revenue, 1.0)
+    gross_margin = np.where(has_rev, gross_profit / safe_rev * 100.0, 0.0)
+    ebit_margin = np.where(has_rev, ebit / safe_rev * 100.0, 0.0)
+    net_margin = np.where(has_rev, net_income / safe_rev * 100.0, 0.0)
+    
+    return np.column_stack((revenue, gross_profit, opex, ebit, net_income,
+                            ppe_net, total_assets, total_liab, total_equity, cfo, cfi, cff,
+                            gross_margin, ebit_margin, net_margin))
+
+
+def _derive(d: _ZeroDict) -> _Derived:
+    """
+    Compute derived totals for a single year (scalar path for short histories)
+    
+    Args:
+        d: Zero-default dict of {line_item: value} for one year
+    
+    Returns:
+        _Derived totals, identical to the matching _derive_matrix row
+    """
+    revenue = d['revenue']
+    gross_profit = revenue - d['cogs']
+    opex = sum(_OPEX_GET(d))
+    ebit = gross_profit - opex
+    net_income = ebit - d['interest_expense'] - d['tax_expense']
+    
+    ppe_net = d['ppe_gross'] - d['accumulated_depreciation']
+    total_assets = sum(_CURRENT_ASSET_GET(d)) + ppe_net
+    total_liab = sum(_LIAB_GET(d))
+    total_equity = sum(_EQUITY_GET(d))
+    
+    cfo = net_income + d['depreciation_expense'] + sum(_CFO_DELTA_GET(d))
+    cfi = d['capex']
+    cff = d['stock_issuance'] - d['dividends'] + d['delta_debt']
+    
+    if revenue > 0:
+        gross_margin = gross_profit / revenue * 100.0
+        ebit_margin = ebit / revenue * 100.0
+        net_margin = net_income / revenue * 100.0
+    else:
+        gross_margin = ebit_margin = net_margin = 0.0
+    
+    return _Derived(revenue, gross_profit, opex, ebit, net_income,
+                    ppe_net, total_assets, total_liab, total_equity, cfo, cfi, cff,
+                    gross_margin, ebit_margin, net_margin)
+
+
+def _derive_years(financial_data: Dict[int, Dict], years: List[int]) -> Dict[int, _Derived]:
+    """Derived totals per year, keyed by year"""
+    if len(years) < _MATRIX_MIN_YEARS:
+        return {year: _derive(_ZeroDict(financial_data[year])) for year in years}
+    
+    X = np.empty((len(years), len(INPUT_KEYS)), dtype=np.float64)
+    for i, year in enumerate(years):
+        X[i] = _INPUT_GET(_ZeroDict(financial_data[year]))
+    return {year: _Derived(*row) for year, row in zip(years, _derive_matrix(X).tolist())}
+
+
+# Rule-based report sections, rendered with str.format_map
+_IS_TEMPLATE = (
+    "\n\n📈 INCOME STATEMENT ({year})\n"
+    "Revenue: ${revenue:,.0f}\n"
+    "Gross Margin: {gross_margin:.1f}%\n"
+    "EBIT Margin: {ebit_margin:.1f}%\n"
+    "Net Margin: {net_margin:.1f}%\n"
+    "Net Income: ${net_income:,.0f}"
+)
+_TREND_TEMPLATE = (
+    "\n\n📊 TREND ANALYSIS ({first_year} to {latest_year})\n"
+    "Revenue Growth: {rev_growth:+.1f}%\n"
+    "Net Income Growth: {ni_growth:+.1f}%"
+)
+_BS_TEMPLATE = (
+    "\n\n💰 BALANCE SHEET ({year})\n"
+    "Total Assets: ${total_assets:,.0f}\n"
+    "Total Liabilities: ${total_liab:,.0f}\n"
+    "Total Equity: ${total_equity:,.0f}\n"
+    "Debt-to-Equity Ratio: {debt_to_equity:.2f}x"
+)
+_CF_TEMPLATE = (
+    "\n\n💵 CASH FLOW ({year})\n"
+    "Operating Cash Flow: ${cfo:,.0f}\n"
+    "Investing Cash Flow: ${cfi:,.0f}\n"
+    "Financing Cash Flow: ${cff:,.0f}"
+)
+
+
+# Instruction prompt for the AI summary; {context} is the per-year data block
+_AI_PROMPT_TEMPLATE = """You are a financial analyst. Analyze this financial data and provide:
+
+1. Executive Summary (2-3 sentences)
+2. Key Trends (revenue, profitability)
+3. Financial Health Assessment
+4. Recommendations (2-3 actionable items)
+
+IMPORTANT: Only analyze statements that are marked as "Available". Do NOT make assumptions about missing data.
+
+{context}
+
+Provide concise, professional analysis suitable for a management report."""
+
+
+# Memoized summaries keyed by a digest of (financial_data, flags)
+_SUMMARY_CACHE_MAXSIZE = 32
+_summary_cache: Dict[bytes, object] = {}
+# Guards the cache: the fallback worker and Streamlit session threads share it
+_summary_cache_lock = threading.Lock()
+
+
+def _summary_cache_key(financial_data: Dict[int, Dict], *flags) -> bytes:
+    """Stable digest of the summary inputs"""
+    items = sorted((year, sorted(data.items())) for year, data in financial_data.items())
+    return hashlib.blake2b(repr((items, flags)).encode(), digest_size=16).digest()
+
+
+def _summary_cache_store(key: bytes, value) -> None:
+    """Store a summary, evicting the oldest entry when full"""
+    with _summary_cache_lock:
+        if key not in _summary_cache and len(_summary_cache) >= _SUMMARY_CACHE_MAXSIZE:
+            _summary_cache.pop(next(iter(_summary_cache)), None)
+        _summary_cache[key] = value
+
+
+# Single worker that prepares the rule-based fallback while the AI call is in flight
+_fallback_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='summary-fallback')
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str):
+    """Anthropic client per API key, reused across calls"""
+    if _Anthropic is None:
+        raise ImportError("No module named 'anthropic'")
+    return _Anthropic(api_key=api_key)
 
 
 def generate_rule_based_summary(financial_data: Dict[int, Dict],
                                 has_balance_sheet: bool = True,
-                                has_cash_flow: bool = True) -> str:
+                                has_cash_flow: bool = True,
+                                years: Optional[Sequence[int]] = None) -> str:
     """
     Generate rule-based summary when AI is unavailable
     
@@ -18,11 +271,21 @@ def generate_rule_based_summary(financial_data: Dict[int, Dict],
         financial_data: Dict of {year: {line_item: value}}
         has_balance_sheet: Whether balance sheet is available
         has_cash_flow: Whether cash flow is available
+        years: Optional pre-sorted years of financial_data (sorted here if omitted)
     
     Returns:
         Summary text
     """
-    years = sorted(financial_data.keys())
+    years = sorted(financial_data) if years is None else list(years)
+    
+    key = _summary_cache_key(financial_data, 'rule_based', has_balance_sheet, has_cash_flow,
+                             tuple(years))
+    with _summary_cache_lock:
+        cached = _summary_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    derived = _derive_years(financial_data, years)
     
     summary_parts = []
     
@@ -33,141 +296,49 @@ def generate_rule_based_summary(financial_data: Dict[int, Dict],
     # Income Statement Analysis (always available)
     if len(years) >= 1:
         latest_year = years[-1]
-        latest = financial_data[latest_year]
-        
-        revenue = latest.get('revenue', 0)
-        gross_profit = revenue - latest.get('cogs', 0)
-        gross_margin = (gross_profit / revenue * 100) if revenue > 0 else 0
-        
-        total_opex = sum([
-            latest.get('distribution_expenses', 0),
-            latest.get('marketing_admin', 0),
-            latest.get('research_dev', 0),
-            latest.get('depreciation_expense', 0)
-        ])
-        ebit = gross_profit - total_opex
-        ebit_margin = (ebit / revenue * 100) if revenue > 0 else 0
-        
-        net_income = ebit - latest.get('interest_expense', 0) - latest.get('tax_expense', 0)
-        net_margin = (net_income / revenue * 100) if revenue > 0 else 0
-        
-        summary_parts.append(f"\n\n📈 INCOME STATEMENT ({latest_year})")
-        summary_parts.append(f"Revenue: ${revenue:,.0f}")
-        summary_parts.append(f"Gross Margin: {gross_margin:.1f}%")
-        summary_parts.append(f"EBIT Margin: {ebit_margin:.1f}%")
-        summary_parts.append(f"Net Margin: {net_margin:.1f}%")
-        summary_parts.append(f"Net Income: ${net_income:,.0f}")
+        view = derived[latest_year]._asdict()
+        view['year'] = latest_year
+        summary_parts.append(_IS_TEMPLATE.format_map(view))
     
     # Trend Analysis (if multi-year)
     if len(years) >= 2:
         first_year = years[0]
         latest_year = years[-1]
+        first = derived[first_year]
+        latest = derived[latest_year]
         
-        rev_first = financial_data[first_year].get('revenue', 0)
-        rev_latest = financial_data[latest_year].get('revenue', 0)
-        rev_growth = ((rev_latest / rev_first - 1) * 100) if rev_first > 0 else 0
-        
-        ni_first = (financial_data[first_year].get('revenue', 0) - 
-                   financial_data[first_year].get('cogs', 0) - 
-                   sum([financial_data[first_year].get(k, 0) for k in 
-                       ['distribution_expenses', 'marketing_admin', 'research_dev', 
-                        'depreciation_expense', 'interest_expense', 'tax_expense']]))
-        ni_latest = (financial_data[latest_year].get('revenue', 0) - 
-                    financial_data[latest_year].get('cogs', 0) - 
-                    sum([financial_data[latest_year].get(k, 0) for k in 
-                        ['distribution_expenses', 'marketing_admin', 'research_dev', 
-                         'depreciation_expense', 'interest_expense', 'tax_expense']]))
-        ni_growth = ((ni_latest / ni_first - 1) * 100) if ni_first > 0 else 0
-        
-        summary_parts.append(f"\n\n📊 TREND ANALYSIS ({first_year} to {latest_year})")
-        summary_parts.append(f"Revenue Growth: {rev_growth:+.1f}%")
-        summary_parts.append(f"Net Income Growth: {ni_growth:+.1f}%")
+        summary_parts.append(_TREND_TEMPLATE.format_map({
+            'first_year': first_year,
+            'latest_year': latest_year,
+            'rev_growth': ((latest.revenue / first.revenue - 1) * 100) if first.revenue > 0 else 0,
+            'ni_growth': ((latest.net_income / first.net_income - 1) * 100) if first.net_income > 0 else 0,
+        }))
     
     # Balance Sheet Analysis (if available)
+    debt_to_equity = None
     if has_balance_sheet and len(years) >= 1:
         latest_year = years[-1]
-        latest = financial_data[latest_year]
-        
-        total_assets = sum([
-            latest.get('cash', 0),
-            latest.get('accounts_receivable', 0),
-            latest.get('inventory', 0),
-            latest.get('prepaid_expenses', 0),
-            latest.get('other_current_assets', 0),
-            latest.get('ppe_gross', 0),
-            -latest.get('accumulated_depreciation', 0)
-        ])
-        
-        total_liab = sum([
-            latest.get('accounts_payable', 0),
-            latest.get('accrued_payroll', 0),
-            latest.get('deferred_revenue', 0),
-            latest.get('interest_payable', 0),
-            latest.get('other_current_liabilities', 0),
-            latest.get('income_taxes_payable', 0),
-            latest.get('long_term_debt', 0)
-        ])
-        
-        total_equity = sum([
-            latest.get('common_stock', 0),
-            latest.get('retained_earnings', 0)
-        ])
-        
-        debt_to_equity = (total_liab / total_equity) if total_equity > 0 else 0
-        
-        summary_parts.append(f"\n\n💰 BALANCE SHEET ({latest_year})")
-        summary_parts.append(f"Total Assets: ${total_assets:,.0f}")
-        summary_parts.append(f"Total Liabilities: ${total_liab:,.0f}")
-        summary_parts.append(f"Total Equity: ${total_equity:,.0f}")
-        summary_parts.append(f"Debt-to-Equity Ratio: {debt_to_equity:.2f}x")
+        d = derived[latest_year]
+        debt_to_equity = (d.total_liab / d.total_equity) if d.total_equity > 0 else 0
+        view = d._asdict()
+        view['year'] = latest_year
+        view['debt_to_equity'] = debt_to_equity
+        summary_parts.append(_BS_TEMPLATE.format_map(view))
     
     # Cash Flow Analysis (if available and multi-year)
     if has_cash_flow and len(years) >= 2:
         latest_year = years[-1]
-        latest = financial_data[latest_year]
-        
-        cfo = sum([
-            latest.get('revenue', 0) - latest.get('cogs', 0) - 
-            sum([latest.get(k, 0) for k in ['distribution_expenses', 'marketing_admin', 
-                                            'research_dev', 'depreciation_expense', 
-                                            'interest_expense', 'tax_expense']]),
-            latest.get('depreciation_expense', 0),
-            latest.get('delta_ar', 0),
-            latest.get('delta_inventory', 0),
-            latest.get('delta_prepaid', 0),
-            latest.get('delta_other_current_assets', 0),
-            latest.get('delta_ap', 0),
-            latest.get('delta_accrued_payroll', 0),
-            latest.get('delta_deferred_revenue', 0),
-            latest.get('delta_interest_payable', 0),
-            latest.get('delta_other_current_liabilities', 0),
-            latest.get('delta_income_taxes_payable', 0),
-        ])
-        
-        cfi = latest.get('capex', 0)
-        cff = (latest.get('stock_issuance', 0) - latest.get('dividends', 0) + 
-              latest.get('delta_debt', 0))
-        
-        summary_parts.append(f"\n\n💵 CASH FLOW ({latest_year})")
-        summary_parts.append(f"Operating Cash Flow: ${cfo:,.0f}")
-        summary_parts.append(f"Investing Cash Flow: ${cfi:,.0f}")
-        summary_parts.append(f"Financing Cash Flow: ${cff:,.0f}")
+        view = derived[latest_year]._asdict()
+        view['year'] = latest_year
+        summary_parts.append(_CF_TEMPLATE.format_map(view))
     
     # Recommendations
     summary_parts.append("\n\n💡 KEY OBSERVATIONS")
     
     if len(years) >= 1:
-        latest_year = years[-1]
-        latest = financial_data[latest_year]
+        net_margin = derived[years[-1]].net_margin
         
         # Profitability
-        revenue = latest.get('revenue', 0)
-        net_income = (revenue - latest.get('cogs', 0) - 
-                     sum([latest.get(k, 0) for k in ['distribution_expenses', 'marketing_admin', 
-                                                     'research_dev', 'depreciation_expense', 
-                                                     'interest_expense', 'tax_expense']]))
-        net_margin = (net_income / revenue * 100) if revenue > 0 else 0
-        
         if net_margin > 15:
             summary_parts.append("✓ Strong profitability with healthy margins")
         elif net_margin > 5:
@@ -175,15 +346,8 @@ def generate_rule_based_summary(financial_data: Dict[int, Dict],
         else:
             summary_parts.append("⚠ Low profitability - review cost structure")
         
-        # Leverage
-        if has_balance_sheet:
-            total_liab = sum([latest.get(k, 0) for k in 
-                            ['accounts_payable', 'accrued_payroll', 'deferred_revenue', 
-                             'interest_payable', 'other_current_liabilities', 
-                             'income_taxes_payable', 'long_term_debt']])
-            total_equity = sum([latest.get(k, 0) for k in ['common_stock', 'retained_earnings']])
-            debt_to_equity = (total_liab / total_equity) if total_equity > 0 else 0
-            
+        # Leverage (reuses the Balance Sheet ratio; None when that section was skipped)
+        if debt_to_equity is not None:
             if debt_to_equity < 1:
                 summary_parts.append("✓ Conservative leverage position")
             elif debt_to_equity < 2:
@@ -200,13 +364,16 @@ def generate_rule_based_summary(financial_data: Dict[int, Dict],
     summary_parts.append("\n\n" + "=" * 60)
     summary_parts.append("Generated by Rule-Based Analysis Engine")
     
-    return "\n".join(summary_parts)
+    summary = "\n".join(summary_parts)
+    _summary_cache_store(key, summary)
+    return summary
 
 
 def generate_ai_summary(financial_data: Dict[int, Dict],
                        has_balance_sheet: bool = True,
                        has_cash_flow: bool = True,
-                       api_key: Optional[str] = None) -> Tuple[str, bool]:
+                       api_key: Optional[str] = None,
+                       years: Optional[Sequence[int]] = None) -> Tuple[str, bool]:
     """
     Generate AI-powered summary using Anthropic Claude
     
@@ -215,47 +382,68 @@ def generate_ai_summary(financial_data: Dict[int, Dict],
         has_balance_sheet: Whether balance sheet is available
         has_cash_flow: Whether cash flow is available
         api_key: Anthropic API key
+        years: Optional pre-sorted years of financial_data (sorted here if omitted)
     
     Returns:
         (summary_text, used_ai_flag)
     """
+    years = sorted(financial_data) if years is None else list(years)
+    
     # Try to get API key
     if not api_key:
         api_key = os.environ.get('ANTHROPIC_API_KEY')
     
     # Fall back to rule-based if no API key
     if not api_key:
-        return generate_rule_based_summary(financial_data, has_balance_sheet, has_cash_flow), False
+        return generate_rule_based_summary(financial_data, has_balance_sheet, has_cash_flow, years), False
+    
+    # Nothing to analyze: skip the API round-trip
+    if not financial_data:
+        return generate_rule_based_summary(financial_data, has_balance_sheet, has_cash_flow, years), False
+    
+    # Key on API-key presence (not value) so AI and rule-based outputs never alias
+    key = _summary_cache_key(financial_data, 'ai', has_balance_sheet, has_cash_flow, True,
+                             tuple(years))
+    with _summary_cache_lock:
+        cached = _summary_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Build the rule-based fallback alongside the API call so it is ready on failure
+    fallback_future = _fallback_executor.submit(
+        generate_rule_based_summary, financial_data, has_balance_sheet, has_cash_flow, years
+    )
     
     try:
-        from anthropic import Anthropic
-        
-        client = Anthropic(api_key=api_key)
+        client = _get_client(api_key)
         
         # Prepare financial data summary
-        years = sorted(financial_data.keys())
+        derived = _derive_years(financial_data, years)
         
         # Build context
-        context = "Financial Data:\n\n"
+        buf = io.StringIO()
+        buf.write("Financial Data:\n\n")
         
         for year in years:
-            data = financial_data[year]
-            context += f"{year}:\n"
-            context += f"  Revenue: ${data.get('revenue', 0):,.0f}\n"
-            context += f"  COGS: ${data.get('cogs', 0):,.0f}\n"
-            context += f"  Operating Expenses: ${sum([data.get(k, 0) for k in ['distribution_expenses', 'marketing_admin', 'research_dev', 'depreciation_expense']]):,.0f}\n"
-            context += f"  Net Income: ${data.get('revenue', 0) - data.get('cogs', 0) - sum([data.get(k, 0) for k in ['distribution_expenses', 'marketing_admin', 'research_dev', 'depreciation_expense', 'interest_expense', 'tax_expense']]):,.0f}\n"
+            data = _ZeroDict(financial_data[year])
+            d = derived[year]
+            buf.write(f"{year}:\n")
+            buf.write(f"  Revenue: ${d.revenue:,.0f}\n")
+            buf.write(f"  COGS: ${data['cogs']:,.0f}\n")
+            buf.write(f"  Operating Expenses: ${d.opex:,.0f}\n")
+            buf.write(f"  Net Income: ${d.net_income:,.0f}\n")
             
             if has_balance_sheet:
-                context += f"  Total Assets: ${sum([data.get(k, 0) for k in ['cash', 'accounts_receivable', 'inventory', 'prepaid_expenses', 'other_current_assets', 'ppe_gross']]) - data.get('accumulated_depreciation', 0):,.0f}\n"
-                context += f"  Total Debt: ${data.get('long_term_debt', 0):,.0f}\n"
+                buf.write(f"  Total Assets: ${d.total_assets:,.0f}\n")
+                buf.write(f"  Total Debt: ${data['long_term_debt']:,.0f}\n")
             
-            context += "\n"
+            buf.write("\n")
         
         # Add data availability notes
-        context += f"\nData Availability:\n"
-        context += f"- Balance Sheet: {'Available' if has_balance_sheet else 'NOT AVAILABLE (TB missing)'}\n"
-        context += f"- Cash Flow: {'Available' if has_cash_flow else 'INCOMPLETE (single year or TB missing)'}\n"
+        buf.write("\nData Availability:\n")
+        buf.write(f"- Balance Sheet: {'Available' if has_balance_sheet else 'NOT AVAILABLE (TB missing)'}\n")
+        buf.write(f"- Cash Flow: {'Available' if has_cash_flow else 'INCOMPLETE (single year or TB missing)'}\n")
+        context = buf.getvalue()
         
         # Call Claude
         message = client.messages.create(
@@ -263,18 +451,7 @@ def generate_ai_summary(financial_data: Dict[int, Dict],
             max_tokens=1000,
             messages=[{
                 "role": "user",
-                "content": f"""You are a financial analyst. Analyze this financial data and provide:
-
-1. Executive Summary (2-3 sentences)
-2. Key Trends (revenue, profitability)
-3. Financial Health Assessment
-4. Recommendations (2-3 actionable items)
-
-IMPORTANT: Only analyze statements that are marked as "Available". Do NOT make assumptions about missing data.
-
-{context}
-
-Provide concise, professional analysis suitable for a management report."""
+                "content": _AI_PROMPT_TEMPLATE.format(context=context)
             }]
         )
         
@@ -289,11 +466,13 @@ Provide concise, professional analysis suitable for a management report."""
                 disclaimer += "Cash Flow analysis incomplete (requires multi-year Trial Balance). "
             ai_summary += disclaimer
         
+        # Only successful AI results are cached; failures retry on the next call
+        _summary_cache_store(key, (ai_summary, True))
         return ai_summary, True
         
     except Exception as e:
         # Fall back to rule-based on any error
-        fallback = generate_rule_based_summary(financial_data, has_balance_sheet, has_cash_flow)
+        fallback = fallback_future.result()
         error_note = f"\n\n⚠️ AI summary unavailable ({str(e)}). Using rule-based analysis."
         return fallback + error_note, False
 
@@ -311,15 +490,10 @@ def summarize_validation_issues(issues: list) -> str:
     if not issues:
         return "✓ No data quality issues detected."
     
-    summary = f"⚠️ {len(issues)} data quality issue(s) detected:\n\n"
+    lines = [f"⚠️ {len(issues)} data quality issue(s) detected:\n"]
     
     for issue in issues:
-        severity_emoji = {
-            'Critical': '🔴',
-            'Warning': '🟡',
-            'Info': 'ℹ️'
-        }.get(issue.get('severity', 'Info'), 'ℹ️')
-        
-        summary += f"{severity_emoji} {issue.get('issue', 'Unknown issue')}\n"
+        severity_emoji = SEVERITY_EMOJI.get(issue.get('severity', 'Info'), 'ℹ️')
+        lines.append(f"{severity_emoji} {issue.get('issue', 'Unknown issue')}")
     
-    return summary
+    return "\n".join(lines) + "\n"
@@ -5,6 +5,7 @@ Handles mapping of GL accounts to financial statement line items using:
 2. Secondary: Account number range fallback
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
 import re
@@ -164,6 +165,10 @@ ACCOUNT_NAME_ALIASES = {
 }
 
 
+# Keywords that route an accrued liability to accrued payroll
+_PAYROLL_RE = re.compile(r'payroll|wage|salary|bonus|compensation')
+
+
 # Special handling for accrued liabilities (context-dependent)
 def classify_accrued_liability(account_name: str) -> str:
     """
@@ -171,17 +176,15 @@ def classify_accrued_liability(account_name: str) -> str:
     - If contains payroll/wages/bonus -> Accrued Payroll
     - Else -> Other Current Liabilities
     """
-    account_lower = account_name.lower()
-    
-    payroll_keywords = ['payroll', 'wage', 'salary', 'bonus', 'compensation']
-    
-    for keyword in payroll_keywords:
-        if keyword in account_lower:
-            return 'accrued_payroll'
-    
+    if _PAYROLL_RE.search(account_name.lower()):
+        return 'accrued_payroll'
     return 'other_current_liabilities'
 
 
+# Runs of whitespace collapse to a single space
+_WS_RE = re.compile(r'\s+')
+
+
 def normalize_account_name(name: str) -> str:
     """Normalize account name for matching"""
     if pd.isna(name):
@@ -191,7 +194,7 @@ def normalize_account_name(name: str) -> str:
     normalized = str(name).lower().strip()
     
     # Remove extra whitespace
-    normalized = re.sub(r'\s+', ' ', normalized)
+    normalized = _WS_RE.sub(' ', normalized)
     
     # Remove common punctuation
     normalized = normalized.replace(',', '').replace('.', '').replace('&', 'and')
@@ -207,36 +210,93 @@ def map_account_by_name(account_name: str) -> Optional[str]:
     - Normalize both account name and alias (lowercase, punctuation stripped)
     - Match alias as a whole phrase with word boundaries (avoids substring traps like 'ar' in 'retained')
     - Prefer longer aliases first
-    """
-    if pd.isna(account_name):
-        return None
 
+    Missing names need no guard: they normalize to '' and match nothing.
+    """
     normalized = normalize_account_name(account_name)
 
     # Special handling for accrued liabilities
     if 'accrued' in normalized:
         return classify_accrued_liability(account_name)
 
-    # Check aliases (longest first) with word-boundary phrase matching
+    return _match_alias(normalized)
+
+
+def _build_alias_table() -> List[Tuple['re.Pattern', str]]:
+    """
+    Flatten ACCOUNT_NAME_ALIASES into (compiled phrase pattern, category) pairs
+
+    Order matches the matching priority: categories in declaration order and,
+    within each category, longer aliases first.
+    """
+    table = []
     for fsli_category, aliases in ACCOUNT_NAME_ALIASES.items():
-        for alias in sorted(aliases, key=lambda x: len(x), reverse=True):
+        for alias in sorted(aliases, key=len, reverse=True):
             alias_norm = normalize_account_name(alias)
-            if not alias_norm:
-                continue
-            # Match full phrase with boundaries
-            if re.search(r'\b' + re.escape(alias_norm) + r'\b', normalized):
-                return fsli_category
+            if alias_norm:
+                # Match full phrase with boundaries
+                table.append((re.compile(r'\b' + re.escape(alias_norm) + r'\b'), fsli_category))
+    return table
+
 
+_ALIAS_TABLE = _build_alias_table()
+
+
+def _match_alias(normalized: str) -> Optional[str]:
+    """Highest-priority alias category for an already-normalized account name"""
+    for alias_re, fsli_category in _ALIAS_TABLE:
+        if alias_re.search(normalized):
+            return fsli_category
     return None
+
+
+def _normalize_names(names: pd.Series) -> pd.Series:
+    """normalize_account_name over a whole column, one .str pass per step"""
+    return (
+        names.where(names.notna(), '')
+        .astype(str)
+        .str.lower()
+        .str.strip()
+        .str.replace(_WS_RE, ' ', regex=True)
+        .str.replace(',', '', regex=False)
+        .str.replace('.', '', regex=False)
+        .str.replace('&', 'and', regex=False)
+    )
+
+
+def _map_names(names: pd.Series) -> pd.Series:
+    """
+    map_account_by_name over a whole column
+
+    Ledgers repeat a small set of account names, so only the distinct names
+    are normalized and matched (accrued-liability rows as one batch); the
+    results are scattered back to every row through the factorized codes.
+    """
+    codes, uniques = pd.factorize(names)
+    unique_names = pd.Series(uniques, dtype=object)
+    normalized = _normalize_names(unique_names)
+    categories = normalized.map(_match_alias)
+
+    # Special handling for accrued liabilities
+    accrued = normalized.str.contains('accrued', regex=False)
+    if accrued.any():
+        payroll = unique_names[accrued].str.lower().str.contains(_PAYROLL_RE)
+        categories[accrued] = np.where(payroll, 'accrued_payroll', 'other_current_liabilities')
+
+    # Missing names factorize to -1, which picks the trailing None
+    lookup = np.append(categories.to_numpy(dtype=object), None)
+    return pd.Series(lookup[codes], index=names.index, dtype=object)
+
+
 def map_account_by_range(account_number: int, 
                          custom_ranges: Optional[Dict] = None) -> Optional[str]:
     """
     Map account to FSLI line item by account number range
     Falls back to default ranges if custom not provided
+
+    account_number must not be None; map_accounts filters missing numbers out
+    before calling this (NaN simply falls outside every range).
     """
-    if pd.isna(account_number):
-        return None
-    
     ranges = custom_ranges or DEFAULT_ACCOUNT_RANGES
     
     for fsli_category, (range_start, range_end) in ranges.items():
@@ -246,6 +306,45 @@ def map_account_by_range(account_number: int,
     return None
 
 
+def _build_range_index(ranges: Dict) -> Tuple[pd.IntervalIndex, np.ndarray]:
+    """
+    Closed IntervalIndex over account number ranges, sorted by range start
+
+    Ranges must not overlap, so every account number has at most one
+    category regardless of dict order.
+
+    Returns:
+        Tuple of (interval index, category for each interval)
+    """
+    ordered = sorted(ranges.items(), key=lambda item: item[1])
+    index = pd.IntervalIndex.from_tuples([bounds for _, bounds in ordered], closed='both')
+    if not index.is_non_overlapping_monotonic:
+        raise ValueError("Account number ranges overlap")
+    return index, np.array([fsli_category for fsli_category, _ in ordered], dtype=object)
+
+
+_RANGE_INDEX, _RANGE_CATEGORIES = _build_range_index(DEFAULT_ACCOUNT_RANGES)
+_RANGE_STARTS = _RANGE_INDEX.left.to_numpy(dtype=float)
+_RANGE_ENDS = _RANGE_INDEX.right.to_numpy(dtype=float)
+
+
+def _map_numbers(numbers: pd.Series) -> pd.Series:
+    """
+    map_account_by_range (default ranges) over a whole column
+
+    Binary-searches the sorted range starts, then checks the candidate's end.
+    Missing or out-of-range account numbers map to None.
+    """
+    values = numbers.to_numpy(dtype=float, na_value=np.nan)
+    positions = np.searchsorted(_RANGE_STARTS, values, side='right') - 1
+    found = (positions >= 0) & (values <= _RANGE_ENDS[positions.clip(0)])
+    return pd.Series(
+        np.where(found, _RANGE_CATEGORIES[positions.clip(0)], None),
+        index=numbers.index,
+        dtype=object,
+    )
+
+
 def map_accounts(df: pd.DataFrame, 
                  custom_ranges: Optional[Dict] = None) -> pd.DataFrame:
     """
@@ -270,14 +369,18 @@ def map_accounts(df: pd.DataFrame,
     
     # First pass: Name-based mapping
     if 'AccountName' in df.columns:
-        df['FSLI_Category'] = df['AccountName'].apply(map_account_by_name)
+        df['FSLI_Category'] = _map_names(df['AccountName'])
     
     # Second pass: Range-based mapping for unmapped accounts
     if 'AccountNumber' in df.columns:
         unmapped = df['FSLI_Category'].isna()
-        df.loc[unmapped, 'FSLI_Category'] = df.loc[unmapped, 'AccountNumber'].apply(
-            lambda x: map_account_by_range(x, custom_ranges)
-        )
+        if custom_ranges:
+            unmapped &= df['AccountNumber'].notna()
+            df.loc[unmapped, 'FSLI_Category'] = df.loc[unmapped, 'AccountNumber'].apply(
+                lambda x: map_account_by_range(x, custom_ranges)
+            )
+        elif unmapped.any():
+            df.loc[unmapped, 'FSLI_Category'] = _map_numbers(df.loc[unmapped, 'AccountNumber'])
     
     # Mark remaining as unclassified
     df['FSLI_Category'] = df['FSLI_Category'].fillna('unclassified')
@@ -358,6 +461,4 @@ TEMPLATE_LABEL_MAPPING = {
     'Issuance of Common Stock': 'stock_issuance',
     'Increase/(Decrease) in Long-Term Debt': 'delta_debt',
     'Cash and Equivalents, Beginning of the Year': 'beginning_cash',
-    'Acquisitions of Property and Equipment': 'capex',
-    'Issuance of Common Stock': 'stock_issuance',
 }
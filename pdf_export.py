@@ -8,401 +8,474 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import (SimpleDocTemplate, Paragraph, Spacer, Table, 
-                                TableStyle, PageBreak, KeepTogether)
+                                LongTable, TableStyle, PageBreak, KeepTogether)
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+import hashlib
 import io
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Paragraph and table styles are built once; ReportLab only reads them
+_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=18,
+    textColor=colors.HexColor('#1a1a1a'),
+    spaceAfter=6,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+_SUBTITLE_STYLE = ParagraphStyle(
+    'CustomSubtitle',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    textColor=colors.HexColor('#666666'),
+    spaceAfter=20,
+    alignment=TA_CENTER
+)
+
+_SECTION_STYLE = ParagraphStyle(
+    'SectionHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=14,
+    textColor=colors.HexColor('#2c3e50'),
+    spaceAfter=12,
+    spaceBefore=20,
+    fontName='Helvetica-Bold'
+)
+
+_HEADER_ROW_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+]
+
+_BODY_STYLE = [
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+]
+
+# Fixed row heights (12pt cell leading plus the padding above) so layout
+# doesn't measure every cell; they equal the heights ReportLab would compute
+_HEADER_ROW_HEIGHT = 12 + 3 + 12
+_BODY_ROW_HEIGHT = 12 + 6 + 6
+
+
+def _total_rows_style(line_items: List[Tuple[str, Optional[str], bool]]) -> List[Tuple]:
+    """Bold text with a rule above for every totals row (data rows start at 1)"""
+    commands = []
+    for row, (_, _, is_total) in enumerate(line_items, start=1):
+        if is_total:
+            commands += [
+                ('FONTNAME', (0, row), (-1, row), 'Helvetica-Bold'),
+                ('LINEABOVE', (0, row), (-1, row), 1, colors.black),
+            ]
+    return commands
+
+
+
+
+def _derive_totals(d: Dict) -> Dict[str, Optional[float]]:
+    """
+    Subtotals shown in the statement tables, computed once per year
+    
+    Totals that need revenue and COGS are None when either is missing, which
+    the tables render as a dash.
+    
+    Args:
+        d: One year's {line_item: value}
+    
+    Returns:
+        Dict of {derived key: value or None}
+    """
+    get = d.get
+    total_opex = (get('distribution_expenses', 0) + get('marketing_admin', 0) +
+                  get('research_dev', 0) + get('depreciation_expense', 0))
+    total_current_assets = (get('cash', 0) + get('accounts_receivable', 0) +
+                            get('inventory', 0) + get('prepaid_expenses', 0) +
+                            get('other_current_assets', 0))
+    total_current_liabilities = (get('accounts_payable', 0) + get('accrued_payroll', 0) +
+                                 get('deferred_revenue', 0) + get('interest_payable', 0) +
+                                 get('other_current_liabilities', 0) +
+                                 get('income_taxes_payable', 0))
+    
+    gross_profit = ebit = income_before_taxes = net_income = cash_from_operations = None
+    if 'revenue' in d and 'cogs' in d:
+        gross_profit = d['revenue'] - d['cogs']
+        ebit = gross_profit - total_opex
+        income_before_taxes = ebit - get('interest_expense', 0)
+        net_income = income_before_taxes - get('tax_expense', 0)
+        cash_from_operations = sum([
+            net_income,
+            get('depreciation_expense', 0),
+            get('delta_ar', 0),
+            get('delta_inventory', 0),
+            get('delta_prepaid', 0),
+            get('delta_other_current_assets', 0),
+            get('delta_ap', 0),
+            get('delta_accrued_payroll', 0),
+            get('delta_deferred_revenue', 0),
+            get('delta_interest_payable', 0),
+            get('delta_other_current_liabilities', 0),
+            get('delta_income_taxes_payable', 0),
+        ])
+    
+    return {
+        # Income Statement
+        'gross_profit': gross_profit,
+        'total_opex': total_opex,
+        'ebit': ebit,
+        'income_before_taxes': income_before_taxes,
+        'net_income': net_income,
+        # Balance Sheet
+        'total_current_assets': total_current_assets,
+        'less_accumulated_depreciation': -get('accumulated_depreciation', 0),
+        'ppe_net': get('ppe_gross', 0) - get('accumulated_depreciation', 0),
+        'total_assets': (total_current_assets + get('ppe_gross', 0) -
+                         get('accumulated_depreciation', 0)),
+        'total_current_liabilities': total_current_liabilities,
+        'total_equity': get('common_stock', 0) + get('retained_earnings', 0),
+        'total_liabilities_and_equity': (total_current_liabilities + get('long_term_debt', 0) +
+                                         get('common_stock', 0) + get('retained_earnings', 0)),
+        # Cash Flow
+        'cash_from_operations': cash_from_operations,
+        'dividends_paid': -get('dividends', 0),
+        'cash_from_financing': (get('stock_issuance', 0) - get('dividends', 0) +
+                                get('delta_debt', 0)),
+    }
+
+
+# Statement layouts: (label, key, is_total) rows; keys resolve against
+# _derive_totals first, then the year's line items; None marks a label-only row
+IS_LINE_ITEMS = [
+    ('Revenues', 'revenue', False),
+    ('Cost of Goods Sold', 'cogs', False),
+    ('Gross Profit', 'gross_profit', True),
+    ('', None, False),  # Blank row
+    ('Operating Expenses:', None, False),
+    ('  Distribution Expenses', 'distribution_expenses', False),
+    ('  Marketing and Administration', 'marketing_admin', False),
+    ('  Research and Development', 'research_dev', False),
+    ('  Depreciation', 'depreciation_expense', False),
+    ('Total Operating Expenses', 'total_opex', True),
+    ('', None, False),
+    ('EBIT (Operating Profit)', 'ebit', True),
+    ('Interest Expense', 'interest_expense', False),
+    ('Income Before Taxes', 'income_before_taxes', True),
+    ('Income Tax Expense', 'tax_expense', False),
+    ('Net Income', 'net_income', True),
+]
+
+BS_LINE_ITEMS = [
+    ('ASSETS', None, False),
+    ('Current Assets:', None, False),
+    ('  Cash', 'cash', False),
+    ('  Accounts Receivable', 'accounts_receivable', False),
+    ('  Inventory', 'inventory', False),
+    ('  Prepaid Expenses', 'prepaid_expenses', False),
+    ('  Other Current Assets', 'other_current_assets', False),
+    ('Total Current Assets', 'total_current_assets', True),
+    ('', None, False),
+    ('Non-Current Assets:', None, False),
+    ('  Property, Plant & Equipment - Gross', 'ppe_gross', False),
+    ('  Less: Accumulated Depreciation', 'less_accumulated_depreciation', False),
+    ('  Property, Plant & Equipment - Net', 'ppe_net', False),
+    ('TOTAL ASSETS', 'total_assets', True),
+    ('', None, False),
+    ('LIABILITIES AND EQUITY', None, False),
+    ('Current Liabilities:', None, False),
+    ('  Accounts Payable', 'accounts_payable', False),
+    ('  Accrued Payroll', 'accrued_payroll', False),
+    ('  Deferred Revenue', 'deferred_revenue', False),
+    ('  Interest Payable', 'interest_payable', False),
+    ('  Other Current Liabilities', 'other_current_liabilities', False),
+    ('  Income Taxes Payable', 'income_taxes_payable', False),
+    ('Total Current Liabilities', 'total_current_liabilities', True),
+    ('', None, False),
+    ('Non-Current Liabilities:', None, False),
+    ('  Long-Term Debt', 'long_term_debt', False),
+    ('', None, False),
+    ('Shareholders\' Equity:', None, False),
+    ('  Common Stock and APIC', 'common_stock', False),
+    ('  Retained Earnings', 'retained_earnings', False),
+    ('Total Shareholders\' Equity', 'total_equity', True),
+    ('', None, False),
+    ('TOTAL LIABILITIES AND EQUITY', 'total_liabilities_and_equity', True),
+]
+
+CF_LINE_ITEMS = [
+    ('Operating Activities:', None, False),
+    ('  Net Income', 'net_income', False),
+    ('  Depreciation', 'depreciation_expense', False),
+    ('  Change in Accounts Receivable', 'delta_ar', False),
+    ('  Change in Inventory', 'delta_inventory', False),
+    ('  Change in Prepaid Expenses', 'delta_prepaid', False),
+    ('  Change in Other Current Assets', 'delta_other_current_assets', False),
+    ('  Change in Accounts Payable', 'delta_ap', False),
+    ('  Change in Accrued Payroll', 'delta_accrued_payroll', False),
+    ('  Change in Deferred Revenue', 'delta_deferred_revenue', False),
+    ('  Change in Interest Payable', 'delta_interest_payable', False),
+    ('  Change in Other Current Liabilities', 'delta_other_current_liabilities', False),
+    ('  Change in Income Taxes Payable', 'delta_income_taxes_payable', False),
+    ('Cash from Operating Activities', 'cash_from_operations', True),
+    ('', None, False),
+    ('Investing Activities:', None, False),
+    ('  Acquisitions of PP&E', 'capex', False),
+    ('Cash from Investing Activities', 'capex', True),
+    ('', None, False),
+    ('Financing Activities:', None, False),
+    ('  Issuance of Common Stock', 'stock_issuance', False),
+    ('  Dividends', 'dividends_paid', False),
+    ('  Change in Long-Term Debt', 'delta_debt', False),
+    ('Cash from Financing Activities', 'cash_from_financing', True),
+]
+
+_IS_TABLE_STYLE = TableStyle(
+    _HEADER_ROW_STYLE + [
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 1), (0, -1), 'Helvetica'),
+    ] + _BODY_STYLE + _total_rows_style(IS_LINE_ITEMS)
+)
+_BS_TABLE_STYLE = TableStyle(
+    _HEADER_ROW_STYLE + [('ALIGN', (1, 1), (-1, -1), 'RIGHT')] + _BODY_STYLE
+    + _total_rows_style(BS_LINE_ITEMS)
+)
+_CF_TABLE_STYLE = TableStyle(
+    _HEADER_ROW_STYLE + [('ALIGN', (1, 1), (-1, -1), 'RIGHT')] + _BODY_STYLE
+    + _total_rows_style(CF_LINE_ITEMS)
+)
+
+
+# Finished reports keyed by a digest of the inputs; reruns with unchanged
+# data (e.g. every Streamlit rerun) reuse the bytes instead of re-laying out
+_REPORT_CACHE_MAXSIZE = 8
+_report_cache: Dict[bytes, bytes] = {}
+# Guards the cache: the report worker and Streamlit session threads share it
+_report_cache_lock = threading.Lock()
+
+
+def _report_cache_key(financial_data: Dict[int, Dict], *options) -> bytes:
+    """Stable digest of the report inputs"""
+    items = sorted((year, sorted(data.items())) for year, data in financial_data.items())
+    return hashlib.blake2b(repr((items, options)).encode(), digest_size=16).digest()
+
+
+def _report_cache_store(key: bytes, value: bytes) -> None:
+    """Store a report, evicting the oldest entry when full"""
+    with _report_cache_lock:
+        if key not in _report_cache and len(_report_cache) >= _REPORT_CACHE_MAXSIZE:
+            _report_cache.pop(next(iter(_report_cache)), None)
+        _report_cache[key] = value
 
 
 def create_pdf_report(financial_data: Dict[int, Dict],
                      ai_summary: Optional[str] = None,
                      company_name: str = "Sample Company",
-                     unit_label: str = "USD thousands") -> io.BytesIO:
+                     unit_label: str = "USD thousands",
+                     years: Optional[Tuple[int, ...]] = None,
+                     compress: bool = True) -> io.BytesIO:
     """
     Create comprehensive PDF report with all three statements
     
+    Repeat calls with identical inputs return a fresh buffer over the
+    previously built report.
+    
     Args:
         financial_data: Dict of {year: {line_item: value}}
         ai_summary: Optional AI-generated summary text
         company_name: Name to display in report
         unit_label: Unit label (e.g., "USD thousands")
+        years: All years of financial_data in ascending order, Year0 first,
+            when the caller already has them sorted (default: sorted here)
+        compress: zlib-compress page content streams; turn off for previews,
+            which build faster but come out roughly 2.5x larger
     
     Returns:
         BytesIO containing PDF file
     """
+    # Get years (exclude internal Year0 opening balances)
+    all_years = tuple(sorted(financial_data)) if years is None else tuple(years)
+    years = all_years[1:] if len(all_years) > 1 else all_years
+    
+    key = _report_cache_key(financial_data, ai_summary, company_name, unit_label, all_years, compress)
+    with _report_cache_lock:
+        cached = _report_cache.get(key)
+    if cached is not None:
+        return io.BytesIO(cached)
+    
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter,
                            topMargin=0.75*inch, bottomMargin=0.75*inch,
-                           leftMargin=0.75*inch, rightMargin=0.75*inch)
+                           leftMargin=0.75*inch, rightMargin=0.75*inch,
+                           pageCompression=1 if compress else 0)
     
     # Container for elements
     elements = []
     
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=6,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor('#666666'),
-        spaceAfter=20,
-        alignment=TA_CENTER
-    )
-    
-    section_style = ParagraphStyle(
-        'SectionHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=20,
-        fontName='Helvetica-Bold'
-    )
-    
     # Title
-    elements.append(Paragraph(company_name, title_style))
-    elements.append(Paragraph(f"Financial Statements ({unit_label})", subtitle_style))
+    elements.append(Paragraph(company_name, _TITLE_STYLE))
+    elements.append(Paragraph(f"Financial Statements ({unit_label})", _SUBTITLE_STYLE))
     elements.append(Spacer(1, 0.2*inch))
     
-    # Get years (exclude internal Year0 opening balances)
-    all_years = sorted(financial_data.keys())
-    years = all_years[1:] if len(all_years) > 1 else all_years
+    # Subtotals are shared by all three statements (e.g. Net Income)
+    derived = _derive_years(financial_data, years)
     
     # Income Statement
-    elements.append(Paragraph("Income Statement", section_style))
-    is_table = create_income_statement_table(financial_data, years)
+    elements.append(Paragraph("Income Statement", _SECTION_STYLE))
+    is_table = create_income_statement_table(financial_data, years, derived)
     elements.append(is_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Balance Sheet
-    elements.append(Paragraph("Balance Sheet", section_style))
-    bs_table = create_balance_sheet_table(financial_data, years)
+    elements.append(Paragraph("Balance Sheet", _SECTION_STYLE))
+    bs_table = create_balance_sheet_table(financial_data, years, derived)
     elements.append(bs_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Cash Flow Statement
     if len(years) >= 1:
-        elements.append(Paragraph("Cash Flow Statement", section_style))
-        cf_table = create_cash_flow_table(financial_data, years)
+        elements.append(Paragraph("Cash Flow Statement", _SECTION_STYLE))
+        cf_table = create_cash_flow_table(financial_data, years, derived)
         elements.append(cf_table)
         elements.append(Spacer(1, 0.3*inch))
     
     # AI Summary (if provided)
     if ai_summary:
         elements.append(PageBreak())
-        elements.append(Paragraph("AI-Generated Summary & Insights", section_style))
+        elements.append(Paragraph("AI-Generated Summary & Insights", _SECTION_STYLE))
         elements.append(Spacer(1, 0.1*inch))
         
         # Split summary into paragraphs
         for para in ai_summary.split('\n\n'):
             if para.strip():
-                elements.append(Paragraph(para.strip(), styles['Normal']))
+                elements.append(Paragraph(para.strip(), _STYLES['Normal']))
                 elements.append(Spacer(1, 0.1*inch))
     
     # Build PDF
     doc.build(elements)
     buffer.seek(0)
     
+    _report_cache_store(key, buffer.getvalue())
+    
     return buffer
 
 
-def create_income_statement_table(financial_data: Dict[int, Dict], 
-                                   years: List[int]) -> Table:
-    """Create Income Statement table"""
-    
-    # Header row
-    header = ['', *[str(year) for year in years]]
-    
-    # Data rows
-    data = [header]
+# Single worker so report builds run one at a time, off the caller's thread
+_report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pdf-report')
+
+
+def async_build_report(financial_data: Dict[int, Dict],
+                       ai_summary: Optional[str] = None,
+                       company_name: str = "Sample Company",
+                       unit_label: str = "USD thousands",
+                       years: Optional[Tuple[int, ...]] = None,
+                       compress: bool = True) -> Future:
+    """
+    Start create_pdf_report in the background
     
-    # Add line items
-    line_items = [
-        ('Revenues', 'revenue'),
-        ('Cost of Goods Sold', 'cogs'),
-        ('Gross Profit', lambda d: d['revenue'] - d['cogs']),
-        ('', None),  # Blank row
-        ('Operating Expenses:', None),
-        ('  Distribution Expenses', 'distribution_expenses'),
-        ('  Marketing and Administration', 'marketing_admin'),
-        ('  Research and Development', 'research_dev'),
-        ('  Depreciation', 'depreciation_expense'),
-        ('Total Operating Expenses', lambda d: (d.get('distribution_expenses', 0) + 
-                                                 d.get('marketing_admin', 0) + 
-                                                 d.get('research_dev', 0) + 
-                                                 d.get('depreciation_expense', 0))),
-        ('', None),
-        ('EBIT (Operating Profit)', lambda d: (d['revenue'] - d['cogs'] - 
-                                               (d.get('distribution_expenses', 0) + 
-                                                d.get('marketing_admin', 0) + 
-                                                d.get('research_dev', 0) + 
-                                                d.get('depreciation_expense', 0)))),
-        ('Interest Expense', 'interest_expense'),
-        ('Income Before Taxes', lambda d: (d['revenue'] - d['cogs'] - 
-                                           (d.get('distribution_expenses', 0) + 
-                                            d.get('marketing_admin', 0) + 
-                                            d.get('research_dev', 0) + 
-                                            d.get('depreciation_expense', 0)) - 
-                                           d.get('interest_expense', 0))),
-        ('Income Tax Expense', 'tax_expense'),
-        ('Net Income', lambda d: (d['revenue'] - d['cogs'] - 
-                                 (d.get('distribution_expenses', 0) + 
-                                  d.get('marketing_admin', 0) + 
-                                  d.get('research_dev', 0) + 
-                                  d.get('depreciation_expense', 0)) - 
-                                 d.get('interest_expense', 0) - 
-                                 d.get('tax_expense', 0))),
-    ]
+    Lets a caller overlap the build with other work (e.g. loading the next
+    dataset) and join later with .result().
     
-    for label, key in line_items:
-        row = [label]
-        for year in years:
-            if key is None:
-                row.append('')
-            elif callable(key):
-                try:
-                    value = key(financial_data[year])
-                    row.append(f'{value:,.1f}')
-                except:
-                    row.append('—')
-            else:
-                value = financial_data[year].get(key, 0)
-                row.append(f'{value:,.1f}')
-        data.append(row)
+    Builds are deliberately serialized: the executor has a single worker, so
+    queued reports run one after another and ReportLab never lays out two
+    documents concurrently.
     
-    # Create table
-    table = Table(data, colWidths=[3*inch] + [1.2*inch]*len(years))
-    
-    # Style
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-        ('FONTNAME', (0, 1), (0, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        # Bold for totals
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
-    ]))
+    Args:
+        Same as create_pdf_report
     
-    return table
+    Returns:
+        Future resolving to the BytesIO containing the PDF file
+    """
+    return _report_executor.submit(create_pdf_report, financial_data, ai_summary,
+                                   company_name, unit_label, years, compress)
+
+
+def create_income_statement_table(financial_data: Dict[int, Dict], 
+                                   years: Sequence[int],
+                                   derived: Optional[Dict[int, Dict]] = None) -> Table:
+    """Create Income Statement table"""
+    return _render_table(IS_LINE_ITEMS, financial_data, years, _IS_TABLE_STYLE, derived)
 
 
 def create_balance_sheet_table(financial_data: Dict[int, Dict], 
-                               years: List[int]) -> Table:
+                               years: Sequence[int],
+                               derived: Optional[Dict[int, Dict]] = None) -> Table:
     """Create Balance Sheet table"""
-    
-    header = ['', *[str(year) for year in years]]
-    data = [header]
-    
-    line_items = [
-        ('ASSETS', None),
-        ('Current Assets:', None),
-        ('  Cash', 'cash'),
-        ('  Accounts Receivable', 'accounts_receivable'),
-        ('  Inventory', 'inventory'),
-        ('  Prepaid Expenses', 'prepaid_expenses'),
-        ('  Other Current Assets', 'other_current_assets'),
-        ('Total Current Assets', lambda d: (d.get('cash', 0) + 
-                                           d.get('accounts_receivable', 0) + 
-                                           d.get('inventory', 0) + 
-                                           d.get('prepaid_expenses', 0) + 
-                                           d.get('other_current_assets', 0))),
-        ('', None),
-        ('Non-Current Assets:', None),
-        ('  Property, Plant & Equipment - Gross', 'ppe_gross'),
-        ('  Less: Accumulated Depreciation', lambda d: -d.get('accumulated_depreciation', 0)),
-        ('  Property, Plant & Equipment - Net', lambda d: (d.get('ppe_gross', 0) - 
-                                                           d.get('accumulated_depreciation', 0))),
-        ('TOTAL ASSETS', lambda d: (d.get('cash', 0) + d.get('accounts_receivable', 0) + 
-                                   d.get('inventory', 0) + d.get('prepaid_expenses', 0) + 
-                                   d.get('other_current_assets', 0) + d.get('ppe_gross', 0) - 
-                                   d.get('accumulated_depreciation', 0))),
-        ('', None),
-        ('LIABILITIES AND EQUITY', None),
-        ('Current Liabilities:', None),
-        ('  Accounts Payable', 'accounts_payable'),
-        ('  Accrued Payroll', 'accrued_payroll'),
-        ('  Deferred Revenue', 'deferred_revenue'),
-        ('  Interest Payable', 'interest_payable'),
-        ('  Other Current Liabilities', 'other_current_liabilities'),
-        ('  Income Taxes Payable', 'income_taxes_payable'),
-        ('Total Current Liabilities', lambda d: (d.get('accounts_payable', 0) + 
-                                                d.get('accrued_payroll', 0) + 
-                                                d.get('deferred_revenue', 0) + 
-                                                d.get('interest_payable', 0) + 
-                                                d.get('other_current_liabilities', 0) + 
-                                                d.get('income_taxes_payable', 0))),
-        ('', None),
-        ('Non-Current Liabilities:', None),
-        ('  Long-Term Debt', 'long_term_debt'),
-        ('', None),
-        ('Shareholders\' Equity:', None),
-        ('  Common Stock and APIC', 'common_stock'),
-        ('  Retained Earnings', 'retained_earnings'),
-        ('Total Shareholders\' Equity', lambda d: (d.get('common_stock', 0) + 
-                                                   d.get('retained_earnings', 0))),
-        ('', None),
-        ('TOTAL LIABILITIES AND EQUITY', lambda d: (d.get('accounts_payable', 0) + 
-                                                   d.get('accrued_payroll', 0) + 
-                                                   d.get('deferred_revenue', 0) + 
-                                                   d.get('interest_payable', 0) + 
-                                                   d.get('other_current_liabilities', 0) + 
-                                                   d.get('income_taxes_payable', 0) + 
-                                                   d.get('long_term_debt', 0) + 
-                                                   d.get('common_stock', 0) + 
-                                                   d.get('retained_earnings', 0))),
-    ]
-    
-    for label, key in line_items:
-        row = [label]
-        for year in years:
-            if key is None:
-                row.append('')
-            elif callable(key):
-                try:
-                    value = key(financial_data[year])
-                    row.append(f'{value:,.1f}')
-                except:
-                    row.append('—')
-            else:
-                value = financial_data[year].get(key, 0)
-                row.append(f'{value:,.1f}')
-        data.append(row)
-    
-    table = Table(data, colWidths=[3*inch] + [1.2*inch]*len(years))
-    
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
-    ]))
-    
-    return table
+    return _render_table(BS_LINE_ITEMS, financial_data, years, _BS_TABLE_STYLE, derived)
 
 
 def create_cash_flow_table(financial_data: Dict[int, Dict], 
-                           years: List[int]) -> Table:
+                           years: Sequence[int],
+                           derived: Optional[Dict[int, Dict]] = None) -> Table:
     """Create Cash Flow Statement table (indirect method)"""
+    # Reported (non-derived) cash-flow lines show a dash instead of 0.0
+    return _render_table(CF_LINE_ITEMS, financial_data, years, _CF_TABLE_STYLE, derived,
+                         zero_as_dash=True)
+
+
+def _derive_years(financial_data: Dict[int, Dict], years: Sequence[int]) -> Dict[int, Dict]:
+    """_derive_totals for each year shown"""
+    return {year: _derive_totals(financial_data[year]) for year in years}
+
+
+def _render_table(line_items: List[Tuple[str, Optional[str], bool]],
+                  financial_data: Dict[int, Dict],
+                  years: Sequence[int],
+                  style: TableStyle,
+                  derived: Optional[Dict[int, Dict]] = None,
+                  zero_as_dash: bool = False) -> Table:
+    """
+    Render statement line items into a styled Table
+    
+    Args:
+        line_items: (label, key, is_total) rows; key is a _derive_totals key,
+            a line item key, or None for a label-only row
+        financial_data: Dict of {year: {line_item: value}}
+        years: Years to show as columns
+        style: Prebuilt TableStyle for the statement
+        derived: {year: _derive_totals(...)} already computed by the caller
+            for these years (default: computed here)
+        zero_as_dash: Render zero line-item values as a dash
     
-    header = ['', *[str(year) for year in years]]
-    data = [header]
+    Returns:
+        Table with a header row of years followed by one row per line item
+    """
+    if derived is None:
+        derived = _derive_years(financial_data, years)
     
-    line_items = [
-        ('Operating Activities:', None),
-        ('  Net Income', lambda d: (d['revenue'] - d['cogs'] - 
-                                   (d.get('distribution_expenses', 0) + 
-                                    d.get('marketing_admin', 0) + 
-                                    d.get('research_dev', 0) + 
-                                    d.get('depreciation_expense', 0)) - 
-                                   d.get('interest_expense', 0) - 
-                                   d.get('tax_expense', 0))),
-        ('  Depreciation', 'depreciation_expense'),
-        ('  Change in Accounts Receivable', 'delta_ar'),
-        ('  Change in Inventory', 'delta_inventory'),
-        ('  Change in Prepaid Expenses', 'delta_prepaid'),
-        ('  Change in Other Current Assets', 'delta_other_current_assets'),
-        ('  Change in Accounts Payable', 'delta_ap'),
-        ('  Change in Accrued Payroll', 'delta_accrued_payroll'),
-        ('  Change in Deferred Revenue', 'delta_deferred_revenue'),
-        ('  Change in Interest Payable', 'delta_interest_payable'),
-        ('  Change in Other Current Liabilities', 'delta_other_current_liabilities'),
-        ('  Change in Income Taxes Payable', 'delta_income_taxes_payable'),
-        ('Cash from Operating Activities', lambda d: sum([
-            d['revenue'] - d['cogs'] - (d.get('distribution_expenses', 0) + 
-                                       d.get('marketing_admin', 0) + 
-                                       d.get('research_dev', 0) + 
-                                       d.get('depreciation_expense', 0)) - 
-            d.get('interest_expense', 0) - d.get('tax_expense', 0),
-            d.get('depreciation_expense', 0),
-            d.get('delta_ar', 0),
-            d.get('delta_inventory', 0),
-            d.get('delta_prepaid', 0),
-            d.get('delta_other_current_assets', 0),
-            d.get('delta_ap', 0),
-            d.get('delta_accrued_payroll', 0),
-            d.get('delta_deferred_revenue', 0),
-            d.get('delta_interest_payable', 0),
-            d.get('delta_other_current_liabilities', 0),
-            d.get('delta_income_taxes_payable', 0),
-        ])),
-        ('', None),
-        ('Investing Activities:', None),
-        ('  Acquisitions of PP&E', 'capex'),
-        ('Cash from Investing Activities', 'capex'),
-        ('', None),
-        ('Financing Activities:', None),
-        ('  Issuance of Common Stock', 'stock_issuance'),
-        ('  Dividends', lambda d: -d.get('dividends', 0)),
-        ('  Change in Long-Term Debt', 'delta_debt'),
-        ('Cash from Financing Activities', lambda d: (d.get('stock_issuance', 0) - 
-                                                     d.get('dividends', 0) + 
-                                                     d.get('delta_debt', 0))),
-    ]
+    # Header row
+    data = [['', *[str(year) for year in years]]]
     
-    for label, key in line_items:
+    for label, key, _ in line_items:
         row = [label]
         for year in years:
             if key is None:
                 row.append('')
-            elif callable(key):
-                try:
-                    value = key(financial_data[year])
-                    row.append(f'{value:,.1f}')
-                except:
-                    row.append('—')
+            elif key in derived[year]:
+                value = derived[year][key]
+                row.append('—' if value is None else f'{value:,.1f}')
             else:
                 value = financial_data[year].get(key, 0)
-                row.append(f'{value:,.1f}' if value != 0 else '—')
+                row.append('—' if zero_as_dash and value == 0 else f'{value:,.1f}')
         data.append(row)
     
-    table = Table(data, colWidths=[3*inch] + [1.2*inch]*len(years))
-    
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ('FONTNAME', (0, 13), (-1, 13), 'Helvetica-Bold'),
-        ('LINEABOVE', (0, 13), (-1, 13), 1, colors.black),
-    ]))
+    table = LongTable(data, colWidths=[3*inch] + [1.2*inch]*len(years),
+                      rowHeights=[_HEADER_ROW_HEIGHT] + [_BODY_ROW_HEIGHT]*len(line_items))
+    table.setStyle(style)
     
     return table
 
+
 # Alias for backwards compatibility
 generate_pdf_report = create_pdf_report
\ No newline at end of file
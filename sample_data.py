@@ -16,31 +16,59 @@ from __future__ import annotations
 
 import os
 import random
+from functools import lru_cache
 from typing import List, Tuple, Optional, Dict
 
 import pandas as pd
 
 
-def get_sample_data_path(filename: str) -> str:
-    """
-    Resolve a sample/backup data file path by checking common locations.
-    """
-    base_dir = os.path.dirname(__file__)
+# Path each asset resolved to, per (asset folder, filename, working directory)
+_RESOLVED_PATHS: Dict[Tuple[str, str, str], str] = {}
+
 
-    possible_paths = [
-        os.path.join(base_dir, filename),
-        os.path.join(base_dir, "assets", "sample_data", filename),
-        os.path.join("assets", "sample_data", filename),
-        os.path.join("accounting_app", "assets", "sample_data", filename),
-        os.path.join("/home/claude/accounting_app", "assets", "sample_data", filename),
-        filename,  # current directory
+def _asset_dirs(asset_folder: str) -> List[str]:
+    """Candidate directories for an asset folder, in lookup order"""
+    base_dir = os.path.dirname(__file__)
+    return [
+        base_dir,
+        os.path.join(base_dir, "assets", asset_folder),
+        os.path.join("assets", asset_folder),
+        os.path.join("accounting_app", "assets", asset_folder),
+        os.path.join("/home/claude/accounting_app", "assets", asset_folder),
+        "",  # current directory
     ]
 
-    for path in possible_paths:
+
+def _resolve_asset(filename: str, asset_folder: str) -> Optional[str]:
+    """
+    Path to an asset file, or None if no candidate directory has it.
+
+    A file that resolved before is confirmed with a single existence check and
+    kept even if a higher-priority copy appears later; otherwise the candidate
+    directories are searched in _asset_dirs order.
+    """
+    key = (asset_folder, filename, os.getcwd())
+    path = _RESOLVED_PATHS.get(key)
+    if path is not None and os.path.exists(path):
+        return path
+
+    for directory in _asset_dirs(asset_folder):
+        path = os.path.join(directory, filename)
         if os.path.exists(path):
+            _RESOLVED_PATHS[key] = path
             return path
 
-    raise FileNotFoundError(f"Sample/backup data file not found: {filename}")
+    return None
+
+
+def get_sample_data_path(filename: str) -> str:
+    """
+    Resolve a sample/backup data file path by checking common locations.
+    """
+    path = _resolve_asset(filename, "sample_data")
+    if path is None:
+        raise FileNotFoundError(f"Sample/backup data file not found: {filename}")
+    return path
 
 
 def _list_dir_candidates() -> List[str]:
@@ -77,6 +105,7 @@ def list_backup_sets(require_with_txnid: bool = True) -> List[Tuple[int, int]]:
       List of (start_year, end_year) tuples.
     """
     files = _list_dir_candidates()
+    present = set(files)
     sets = set()
 
     for fn in files:
@@ -93,9 +122,11 @@ def list_backup_sets(require_with_txnid: bool = True) -> List[Tuple[int, int]]:
         tb_name = f"backup_tb_{y0}_{y1}.csv"
         gl_name = f"backup_gl_{y0}_{y1}_{'with_txnid' if require_with_txnid else 'no_txnid'}.csv"
 
+        # Names from the listing need no lookup; anything else goes through the resolver
         try:
-            get_sample_data_path(tb_name)
-            get_sample_data_path(gl_name)
+            for name in (tb_name, gl_name):
+                if name not in present:
+                    get_sample_data_path(name)
             sets.add((y0, y1))
         except Exception:
             continue
@@ -103,6 +134,18 @@ def list_backup_sets(require_with_txnid: bool = True) -> List[Tuple[int, int]]:
     return sorted(list(sets))
 
 
+@lru_cache(maxsize=16)
+def _read_csv_cached(path: str, mtime: float, size: int) -> pd.DataFrame:
+    """Parsed CSV; keyed on mtime/size so an edited pack is re-read. Never hand this frame out directly."""
+    return pd.read_csv(path)
+
+
+def _read_csv(path: str) -> pd.DataFrame:
+    """Private copy of a cached parsed CSV, so callers can mutate it freely"""
+    stat = os.stat(path)
+    return _read_csv_cached(path, stat.st_mtime, stat.st_size).copy()
+
+
 def load_backup_set(start_year: int, end_year: int, with_txnid: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame, str]:
     """
     Load a specific backup TB+GL set.
@@ -110,8 +153,8 @@ def load_backup_set(start_year: int, end_year: int, with_txnid: bool = True) ->
     tb_file = f"backup_tb_{start_year}_{end_year}.csv"
     gl_file = f"backup_gl_{start_year}_{end_year}_{'with_txnid' if with_txnid else 'no_txnid'}.csv"
 
-    tb_df = pd.read_csv(get_sample_data_path(tb_file))
-    gl_df = pd.read_csv(get_sample_data_path(gl_file))
+    tb_df = _read_csv(get_sample_data_path(tb_file))
+    gl_df = _read_csv(get_sample_data_path(gl_file))
     return tb_df, gl_df, f"{start_year}_{end_year}"
 
 
@@ -140,24 +183,12 @@ def get_template_path(template_type: str = "zero") -> str:
       - 'zero' -> processing template (TEMPLATE_ZERO)
       - 'demo' -> sample demo template (SAMPLE_DEMO)
     """
-    base_dir = os.path.dirname(__file__)
-
     if template_type == "zero":
         filename = "Financial_Model_TEMPLATE_ZERO_USD_thousands_GAAP.xlsx"
     else:
         filename = "Financial_Model_SAMPLE_DEMO_USD_thousands_GAAP.xlsx"
 
-    possible_paths = [
-        os.path.join(base_dir, filename),
-        os.path.join(base_dir, "assets", "templates", filename),
-        os.path.join("assets", "templates", filename),
-        os.path.join("accounting_app", "assets", "templates", filename),
-        os.path.join("/home/claude/accounting_app", "assets", "templates", filename),
-        filename,
-    ]
-
-    for path in possible_paths:
-        if os.path.exists(path):
-            return path
-
-    raise FileNotFoundError(f"Template file not found: {filename}")
+    path = _resolve_asset(filename, "templates")
+    if path is None:
+        raise FileNotFoundError(f"Template file not found: {filename}")
+    return path
@@ -9,7 +9,9 @@ Focus:
   3) Load Random Sample Set (TB+GL together, matched years)
 """
 
+import hashlib
 import io
+import random
 import zipfile
 from datetime import datetime
 
@@ -32,7 +34,7 @@ from excel_writer import (
     write_financial_data_to_template,
     compute_reconciliation_checks,
 )
-from sample_data import get_sample_data_path, get_template_path
+from sample_data import get_template_path, load_backup_set
 from pdf_export import generate_pdf_report
 from ai_summary import generate_ai_summary
 import os
@@ -56,6 +58,13 @@ UNIT_SCALE_OPTIONS = {
     "USD thousands (÷ 1000)": 1000,
 }
 
+# Entries kept per st.cache_data function; the cache is shared by every session
+# in the server process, so uploads and results must not accumulate unbounded
+APP_CACHE_MAX_ENTRIES = 8
+
+# Year ranges of the bundled backup TB+GL packs
+SAMPLE_YEAR_RANGES = ((2020, 2022), (2021, 2023), (2022, 2024), (2023, 2025), (2024, 2026))
+
 # Session state init
 for k, default in {
     "tb_df": None,
@@ -103,10 +112,20 @@ def _count_by_severity(issues):
     return counts
 
 
-def _find_row_exact(ws, label: str, start_row: int = 1, end_row: int = 200):
+def _read_column_a(template_path: str) -> list:
+    """Column A values of the template's model sheet (index r - 1 is row r), from one read-only pass."""
+    wb = openpyxl.load_workbook(template_path, read_only=True, data_only=False, keep_links=False)
+    try:
+        ws = wb["Blank 3 Statement Model"] if "Blank 3 Statement Model" in wb.sheetnames else wb[wb.sheetnames[0]]
+        return [row[0] for row in ws.iter_rows(max_col=1, values_only=True)]
+    finally:
+        wb.close()
+
+
+def _find_row_exact(column: list, label: str, start_row: int = 1, end_row: int = 200):
     target = str(label).strip().lower()
-    for r in range(start_row, end_row + 1):
-        v = ws.cell(r, 1).value
+    for r in range(start_row, min(end_row, len(column)) + 1):
+        v = column[r - 1]
         if v is None:
             continue
         if str(v).strip().lower() == target:
@@ -114,10 +133,10 @@ def _find_row_exact(ws, label: str, start_row: int = 1, end_row: int = 200):
     return None
 
 
-def _extract_labels(ws, start_row: int, end_row: int) -> list[str]:
+def _extract_labels(column: list, start_row: int, end_row: int) -> list[str]:
     labels = []
     for r in range(start_row, end_row + 1):
-        v = ws.cell(r, 1).value
+        v = column[r - 1] if r <= len(column) else None
         if v is None:
             labels.append("")
         else:
@@ -136,8 +155,7 @@ def _compute_template_preview_sections(financial_data: dict, template_path: str,
     if not financial_data:
         return {}
 
-    wb = openpyxl.load_workbook(template_path, data_only=False)
-    ws = wb["Blank 3 Statement Model"] if "Blank 3 Statement Model" in wb.sheetnames else wb[wb.sheetnames[0]]
+    column = _read_column_a(template_path)
 
     years_all = sorted(financial_data.keys())
     stmt_years = years_all[1:] if len(years_all) > 1 else years_all  # hide Year0 in preview
@@ -207,9 +225,43 @@ def _compute_template_preview_sections(financial_data: dict, template_path: str,
     # Map template label -> internal key (reverse mapping)
     label_to_key = TEMPLATE_LABEL_MAPPING
 
+    # Derived / totals
+    derived = {
+        "Gross Profit": gross_profit,
+        "EBIT (Operating Profit)": ebit,
+        "Income Before Taxes": ebt,
+        "Net Income": net_income,
+        "Total Current Assets": total_current_assets,
+        "Property Plant and Equipment - Net": net_ppe,
+        "TOTAL ASSETS": total_assets,
+        "Total Current Liabilities:": total_current_liab,
+        "Total Shareholders' Equity": total_equity,
+        "TOTAL LIABILITIES AND SHAREHOLDERS' EQUITY": total_le,
+        "Net Cash Provided by Operating Activities": cfo,
+        "Cash Flows from Investing Activities": cfi,
+        "Cash Flows from Financing Activities": cff,
+        "Increase/(Decrease) in Cash and Equivalents": net_change_cash,
+        "Cash and Equivalents, Beginning of the Year": begin_cash,
+        "Cash and Equivalents, End of the Year": end_cash,
+        # Checks (these rows are outside the sections, but safe)
+        "Balance Sheet Check (A - L + E)": bs_check,
+        "Check": cf_check,
+    }
+
+    # Headings / section labels should stay blank; unmapped numeric rows show 0 to avoid "missing statement" look
+    heading_labels = {
+        "ASSETS", "LIABILITIES AND SHAREHOLDERS' EQUITY",
+        "Current Assets:", "Non-Current Assets:", "Current Liabilities:",
+        "Non-Current Liabilities:", "Shareholder's Equity:",
+        "Cash Flow Statement", "Cash Flows from Operating Activities:",
+        "Changes in Operating Assets and Liabilities:", "Investing Activities:",
+        "Financing Activities:",
+        "Revenues", "Operating Expenses", "Other Expense / (Income)", "Taxes",
+    }
+
     # Build a section DataFrame from template row range
     def build_df(row_start: int, row_end: int) -> pd.DataFrame:
-        labels = _extract_labels(ws, row_start, row_end)
+        labels = _extract_labels(column, row_start, row_end)
         data = {}
         for y in stmt_years:
             col = []
@@ -225,42 +277,11 @@ def _compute_template_preview_sections(financial_data: dict, template_path: str,
                     continue
 
                 # Derived / totals
-                derived = {
-                    "Gross Profit": gross_profit,
-                    "EBIT (Operating Profit)": ebit,
-                    "Income Before Taxes": ebt,
-                    "Net Income": net_income,
-                    "Total Current Assets": total_current_assets,
-                    "Property Plant and Equipment - Net": net_ppe,
-                    "TOTAL ASSETS": total_assets,
-                    "Total Current Liabilities:": total_current_liab,
-                    "Total Shareholders' Equity": total_equity,
-                    "TOTAL LIABILITIES AND SHAREHOLDERS' EQUITY": total_le,
-                    "Net Cash Provided by Operating Activities": cfo,
-                    "Cash Flows from Investing Activities": cfi,
-                    "Cash Flows from Financing Activities": cff,
-                    "Increase/(Decrease) in Cash and Equivalents": net_change_cash,
-                    "Cash and Equivalents, Beginning of the Year": begin_cash,
-                    "Cash and Equivalents, End of the Year": end_cash,
-                    # Checks (these rows are outside the sections, but safe)
-                    "Balance Sheet Check (A - L + E)": bs_check,
-                    "Check": cf_check,
-                }
                 if lab in derived:
                     col.append(float(derived[lab](y)))
                     continue
 
 
-                # Headings / section labels should stay blank; unmapped numeric rows show 0 to avoid "missing statement" look
-                heading_labels = {
-                    "ASSETS", "LIABILITIES AND SHAREHOLDERS' EQUITY",
-                    "Current Assets:", "Non-Current Assets:", "Current Liabilities:",
-                    "Non-Current Liabilities:", "Shareholder's Equity:",
-                    "Cash Flow Statement", "Cash Flows from Operating Activities:",
-                    "Changes in Operating Assets and Liabilities:", "Investing Activities:",
-                    "Financing Activities:",
-                    "Revenues", "Operating Expenses", "Other Expense / (Income)", "Taxes",
-                }
                 is_heading = (lab in heading_labels) or (lab.endswith(":") and not lab.lower().startswith("total"))
                 # Some templates use ALL CAPS for section headers; do NOT treat totals as headings (handled above in derived).
                 is_heading = is_heading or (lab.upper() == lab and lab not in {"TOTAL ASSETS", "TOTAL LIABILITIES AND SHAREHOLDERS' EQUITY"})
@@ -276,17 +297,17 @@ def _compute_template_preview_sections(financial_data: dict, template_path: str,
         return df
 
     # Find row ranges by labels (use the template's second 'Income Statement' section for actual output)
-    is_header = _find_row_exact(ws, "Income Statement", start_row=25, end_row=120)  # should find row 30
-    is_start = _find_row_exact(ws, "Revenues", start_row=is_header or 1, end_row=140)
-    is_end = _find_row_exact(ws, "Common Dividends", start_row=is_start or 1, end_row=160)
+    is_header = _find_row_exact(column, "Income Statement", start_row=25, end_row=120)  # should find row 30
+    is_start = _find_row_exact(column, "Revenues", start_row=is_header or 1, end_row=140)
+    is_end = _find_row_exact(column, "Common Dividends", start_row=is_start or 1, end_row=160)
 
-    bs_header = _find_row_exact(ws, "Balance Sheet", start_row=40, end_row=120)  # should find row 48
-    bs_start = _find_row_exact(ws, "ASSETS", start_row=bs_header or 1, end_row=200)
-    bs_end = _find_row_exact(ws, "Check", start_row=bs_start or 1, end_row=140)  # row 81 (check line)
+    bs_header = _find_row_exact(column, "Balance Sheet", start_row=40, end_row=120)  # should find row 48
+    bs_start = _find_row_exact(column, "ASSETS", start_row=bs_header or 1, end_row=200)
+    bs_end = _find_row_exact(column, "Check", start_row=bs_start or 1, end_row=140)  # row 81 (check line)
 
-    cf_header = _find_row_exact(ws, "Cash Flow Statement", start_row=70, end_row=160)  # row 84
-    cf_start = _find_row_exact(ws, "Cash Flows from Operating Activities:", start_row=cf_header or 1, end_row=200)
-    cf_end = _find_row_exact(ws, "Cash and Equivalents, End of the Year", start_row=cf_start or 1, end_row=220)
+    cf_header = _find_row_exact(column, "Cash Flow Statement", start_row=70, end_row=160)  # row 84
+    cf_start = _find_row_exact(column, "Cash Flows from Operating Activities:", start_row=cf_header or 1, end_row=200)
+    cf_end = _find_row_exact(column, "Cash and Equivalents, End of the Year", start_row=cf_start or 1, end_row=220)
 
     sections = {}
 
@@ -316,13 +337,37 @@ def _compute_template_preview_sections(financial_data: dict, template_path: str,
     return sections
 
 
+def _frame_fingerprint(df: pd.DataFrame) -> bytes:
+    """Digest of a frame's columns, dtypes, index and values, used as its cache key."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((list(df.columns), [str(t) for t in df.dtypes])).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.digest()
+
+
+# Hash frames in full; Streamlit's default only samples rows of large frames
+FRAME_HASH_FUNCS = {pd.DataFrame: _frame_fingerprint}
+
+
+@st.cache_data(show_spinner=False, max_entries=APP_CACHE_MAX_ENTRIES, hash_funcs=FRAME_HASH_FUNCS)
+def _validate_tb(tb_df: pd.DataFrame):
+    """validate_trial_balance, computed once per distinct TB."""
+    return validate_trial_balance(tb_df)
+
+
+@st.cache_data(show_spinner=False, max_entries=APP_CACHE_MAX_ENTRIES, hash_funcs=FRAME_HASH_FUNCS)
+def _validate_gl(gl_df: pd.DataFrame):
+    """validate_gl_activity, computed once per distinct GL."""
+    return validate_gl_activity(gl_df)
+
+
 def run_validation():
     """Run validations and store results in session state."""
     tb_df = st.session_state["tb_df"]
     gl_df = st.session_state["gl_df"]
 
-    tb_issues = validate_trial_balance(tb_df) if tb_df is not None else []
-    gl_issues = validate_gl_activity(gl_df) if gl_df is not None else []
+    tb_issues = _validate_tb(tb_df) if tb_df is not None else []
+    gl_issues = _validate_gl(gl_df) if gl_df is not None else []
 
     st.session_state["validation_tb"] = tb_issues
     st.session_state["validation_gl"] = gl_issues
@@ -332,17 +377,11 @@ def run_validation():
 
 def load_random_set():
     """Load matched TB + GL backup sets by choosing one year-range and loading both files."""
-    year_ranges = [(2020, 2022), (2021, 2023), (2022, 2024), (2023, 2025), (2024, 2026)]
-    import random
-    y0, y1 = random.choice(year_ranges)
+    y0, y1 = random.choice(SAMPLE_YEAR_RANGES)
     tb_file = f"backup_tb_{y0}_{y1}.csv"
     gl_file = f"backup_gl_{y0}_{y1}_with_txnid.csv"
 
-    tb_path = get_sample_data_path(tb_file)
-    gl_path = get_sample_data_path(gl_file)
-
-    tb_df = pd.read_csv(tb_path)
-    gl_df = pd.read_csv(gl_path)
+    tb_df, gl_df, _ = load_backup_set(y0, y1, with_txnid=True)
 
     st.session_state["tb_df"] = tb_df
     st.session_state["gl_df"] = gl_df
@@ -364,6 +403,28 @@ def dataset_zip_bytes(tb_df: pd.DataFrame, gl_df: pd.DataFrame, tb_name: str, gl
     return bio.read()
 
 
+@st.cache_data(show_spinner=False, max_entries=APP_CACHE_MAX_ENTRIES)
+def _read_upload(file_bytes: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV; cached on its contents so reruns don't re-parse it."""
+    return pd.read_csv(io.BytesIO(file_bytes))
+
+
+@st.cache_data(show_spinner=False, max_entries=APP_CACHE_MAX_ENTRIES, hash_funcs=FRAME_HASH_FUNCS)
+def _map_and_calculate(tb_df: pd.DataFrame, gl_df: pd.DataFrame) -> dict:
+    """Map accounts and compute the 3-statement data, once per distinct TB + GL."""
+    return calculate_3statements_from_tb_gl(map_accounts(tb_df), map_accounts(gl_df))
+
+
+@st.cache_data(show_spinner=False, max_entries=APP_CACHE_MAX_ENTRIES)
+def _render_excel(template_path: str, template_mtime: float, financial_data: dict, unit_scale: float) -> bytes:
+    """Filled template bytes, once per template version, data and unit scale."""
+    return write_financial_data_to_template(
+        template_path=template_path,
+        financial_data=financial_data,
+        unit_scale=unit_scale,
+    ).getvalue()
+
+
 # ----------------------------
 # Sidebar
 # ----------------------------
@@ -411,14 +472,14 @@ with st.sidebar:
     gl_up = st.file_uploader("Upload GL (CSV)", type=["csv"], key="gl_uploader")
 
     if tb_up is not None:
-        st.session_state["tb_df"] = pd.read_csv(tb_up)
+        st.session_state["tb_df"] = _read_upload(tb_up.getvalue())
         st.session_state["tb_name"] = getattr(tb_up, "name", "tb.csv")
         st.session_state["tb_changes"] = []
         st.session_state["dataset_source"] = "upload"
         run_validation()
 
     if gl_up is not None:
-        st.session_state["gl_df"] = pd.read_csv(gl_up)
+        st.session_state["gl_df"] = _read_upload(gl_up.getvalue())
         st.session_state["gl_name"] = getattr(gl_up, "name", "gl.csv")
         st.session_state["gl_changes"] = []
         st.session_state["dataset_source"] = "upload"
@@ -602,23 +663,20 @@ if st.button("Generate 3-Statement Outputs", type="primary"):
                 st.error("Strict mode: Year0 opening snapshot requirement failed:\n" + "\n".join(year0_issues))
                 st.stop()
 
-    # Map accounts
-    tb_mapped = map_accounts(tb_df)
-    gl_mapped = map_accounts(gl_df)
-
-    # Compute 3-statement data
-    financial_data = calculate_3statements_from_tb_gl(tb_mapped, gl_mapped)
+    # Map accounts and compute 3-statement data
+    financial_data = _map_and_calculate(tb_df, gl_df)
 
     # Write to template
     template_path = get_template_path(st.session_state["template_type"])
-    out_bytes = write_financial_data_to_template(
-        template_path=template_path,
-        financial_data=financial_data,
-        unit_scale=float(st.session_state["unit_scale"]),
+    out_bytes = _render_excel(
+        template_path,
+        os.path.getmtime(template_path),
+        financial_data,
+        float(st.session_state["unit_scale"]),
     )
 
     # Persist output so Streamlit reruns don’t lose it
-    st.session_state["last_excel_bytes"] = out_bytes.getvalue()
+    st.session_state["last_excel_bytes"] = out_bytes
 
     # Build a template-matching preview (Income Statement / Balance Sheet / Cash Flow)
     try:
@@ -634,7 +692,7 @@ if st.button("Generate 3-Statement Outputs", type="primary"):
     st.success("Generated Excel output.")
     st.download_button(
         "Download Excel Output",
-        data=out_bytes.getvalue(),
+        data=out_bytes,
         file_name="3statement_output.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
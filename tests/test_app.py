@@ -19,7 +19,9 @@ from validation import (normalize_column_headers, check_required_columns,
 from mapping import (map_account_by_name, map_account_by_range, map_accounts,
                     normalize_account_name, classify_accrued_liability)
 from excel_writer import (find_row_by_label, is_formula_cell, 
-                          calculate_financial_statements)
+                          calculate_financial_statements, read_template_cells,
+                          calculate_3statements_from_tb_gl)
+from ai_summary import generate_rule_based_summary, generate_ai_summary
 
 
 class TestColumnNormalization:
@@ -226,6 +228,16 @@ class TestAccountMapping:
         assert mapped.loc[2, 'FSLI_Category'] == 'revenue'
         assert mapped.loc[3, 'FSLI_Category'] == 'cogs'
 
+    def test_range_fallback_matches_scalar_lookup(self):
+        """Test column-wise range fallback agrees with map_account_by_range"""
+        numbers = [999, 1000, 1099, 1099.5, 1589, 1590, 1599, 6999, 7000, np.nan]
+        df = pd.DataFrame({'AccountNumber': numbers, 'AccountName': ['Misc'] * len(numbers)})
+
+        mapped = map_accounts(df)
+
+        expected = [map_account_by_range(n) or 'unclassified' for n in numbers]
+        assert mapped['FSLI_Category'].tolist() == expected
+
 
 class TestCommonIssuesValidation:
     """Test common data quality issues"""
@@ -295,6 +307,45 @@ class TestAutoFixes:
         
         assert not fixed['AccountNumber'].isna().any()
         assert fixed.loc[1, 'AccountNumber'] == 9999
+    
+    def test_balance_transactions_adds_suspense_lines(self):
+        """Test each unbalanced transaction gets one offsetting suspense line"""
+        df = pd.DataFrame({
+            'TxnDate': ['2023-01-01', '2023-01-01', '2023-02-01', '2023-02-01', '2023-03-01'],
+            'TransactionID': ['T1', 'T1', 'T2', 'T2', 'T3'],
+            'AccountNumber': [1000, 4000, 1000, 4000, 5000],
+            'AccountName': ['Cash', 'Revenue', 'Cash', 'Revenue', 'COGS'],
+            'Debit': [100, 0, 80, 0, 0],
+            'Credit': [0, 100, 0, 50, 20],
+        })
+        
+        fixed, changes = apply_auto_fixes(df, ['balance_transactions'])
+        added = fixed.iloc[len(df):]
+        
+        assert list(added['TransactionID']) == ['T2', 'T3']
+        assert list(added['AccountNumber']) == [9999, 9999]
+        assert list(added['Debit']) == [0.0, 20.0]
+        assert list(added['Credit']) == [30.0, 0.0]
+        assert list(added['TxnDate']) == [pd.Timestamp('2023-02-01'), pd.Timestamp('2023-03-01')]
+    
+    def test_balance_gl_overall_carries_currency(self):
+        """Test the balancing line takes the first present Currency and PeriodEnd"""
+        df = pd.DataFrame({
+            'TxnDate': ['2023-01-01'] * 3,
+            'AccountNumber': [1000, 4000, 4000],
+            'AccountName': ['Cash', 'Revenue', 'Revenue'],
+            'Debit': [150, 0, 0],
+            'Credit': [0, 100, 0],
+            'Currency': [None, 'EUR', 'USD'],
+            'PeriodEnd': [None, None, None],
+        })
+        
+        fixed, changes = apply_auto_fixes(df, ['balance_gl_overall'])
+        balancing = fixed.iloc[-1]
+        
+        assert balancing['Credit'] == 50
+        assert balancing['Currency'] == 'EUR'
+        assert balancing['PeriodEnd'] is None
 
 
 class TestFinancialStatements:
@@ -320,6 +371,41 @@ class TestFinancialStatements:
         assert financial_data[2023]['cogs'] == 300
         assert financial_data[2023]['marketing_admin'] == 100
         assert financial_data[2023]['tax_expense'] == 20
+    
+    def test_cash_flow_drivers_from_tb_deltas(self):
+        """Test cash-flow drivers are signed year-over-year TB changes"""
+        tb = pd.DataFrame({
+            'TxnDate': pd.to_datetime(['2022-12-31'] * 4 + ['2023-12-31'] * 4),
+            'Debit': [100, 500, 0, 0, 150, 800, 0, 0],
+            'Credit': [0, 0, 300, 600, 0, 0, 250, 700],
+            'FSLI_Category': ['accounts_receivable', 'ppe_gross', 'accounts_payable', 'long_term_debt'] * 2
+        })
+        
+        financial_data = calculate_3statements_from_tb_gl(tb, None, statement_years=1)
+        
+        assert sorted(financial_data) == [2022, 2023]
+        assert financial_data[2023]['delta_ar'] == -50
+        assert financial_data[2023]['delta_ap'] == -50
+        assert financial_data[2023]['delta_debt'] == 100
+        assert financial_data[2023]['capex'] == -300
+        assert financial_data[2023]['stock_issuance'] == 0
+        assert 'delta_ar' not in financial_data[2022]
+
+    def test_bincount_sums_match_groupby(self, monkeypatch):
+        """Test the large-frame bincount aggregation agrees with groupby"""
+        import excel_writer
+
+        gl = pd.DataFrame({
+            'TxnDate': pd.to_datetime(['2022-03-01', '2022-06-01', '2023-01-15', '2023-02-01', '2023-05-01']),
+            'Debit': [0, 40, 0, np.nan, 25],
+            'Credit': [100, 0, 120, 0, 0],
+            'FSLI_Category': ['revenue', 'cogs', 'revenue', 'cogs', None]
+        })
+
+        expected = calculate_financial_statements(gl, is_trial_balance=False)
+        monkeypatch.setattr(excel_writer, 'BINCOUNT_MIN_ROWS', 0)
+
+        assert calculate_financial_statements(gl, is_trial_balance=False) == expected
 
 
 class TestHeaderOrderIndependence:
@@ -385,6 +471,336 @@ class TestMultiYearHandling:
         assert 2025 in financial_data
 
 
+class TestTemplateLookup:
+    """Test label-based row lookup against a template snapshot"""
+    
+    def _worksheet(self):
+        import openpyxl
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws['A1'] = 'Income Statement'
+        ws['A2'] = '  Revenues '
+        ws['A3'] = 'Cost of Goods Sold (COGS)'
+        ws['A4'] = 'Gross Profit'
+        ws['B2'] = 100
+        ws['B4'] = '=B2-B3'
+        return ws
+    
+    def test_find_row_exact_and_contains(self):
+        """Test exact and substring label matches on the snapshot"""
+        _, values = read_template_cells(self._worksheet(), max_col=2)
+        
+        assert find_row_by_label(values, 'revenues') == 2
+        assert find_row_by_label(values, 'Cost of Goods Sold') == 3
+        assert find_row_by_label(values, 'Net Income') is None
+    
+    def test_exact_match_preferred_over_earlier_substring(self):
+        """Test an exact label row wins over an earlier row that only contains it"""
+        from excel_writer import build_label_index
+        
+        values = [['Depreciation (Percent of Sales)'], ['Revenues'], ['Depreciation']]
+        
+        assert find_row_by_label(values, 'Depreciation') == 3
+        assert find_row_by_label(values, 'Percent') == 1
+        assert build_label_index(values, ['Depreciation', 'Percent']) == {'Depreciation': 3, 'Percent': 1}
+    
+    def test_formula_cells_detected(self):
+        """Test formula detection on the snapshot"""
+        cells, _ = read_template_cells(self._worksheet(), max_col=2)
+        
+        assert is_formula_cell(cells, 4, 2)
+        assert not is_formula_cell(cells, 2, 2)
+        
+        from excel_writer import collect_formula_cells
+        assert collect_formula_cells(cells) == {(4, 2)}
+    
+    def test_label_index_matches_linear_lookup(self):
+        """Test the per-load label index agrees with find_row_by_label"""
+        from excel_writer import build_label_index, KEY_TO_LABELS
+        
+        _, values = read_template_cells(self._worksheet(), max_col=2)
+        labels = ['Revenues', 'Cost of Goods Sold', 'Goods Sold', 'Profit', 'Net Income']
+        
+        index = build_label_index(values, labels)
+        
+        assert index == {label: find_row_by_label(values, label) for label in labels}
+        assert KEY_TO_LABELS['dividends'] == ['Common Dividends', 'Dividends (current year)']
+
+    def test_lookup_stops_after_blank_label_run(self):
+        """Test labels past a long run of blank label cells are not matched"""
+        from excel_writer import build_label_index, TEMPLATE_EMPTY_LABEL_RUN
+        
+        values = [['Revenues']] + [[None]] * TEMPLATE_EMPTY_LABEL_RUN + [['Net Income']]
+        
+        assert find_row_by_label(values, 'Revenues') == 1
+        assert find_row_by_label(values, 'Net Income') is None
+        assert build_label_index(values, ['Net Income']) == {'Net Income': None}
+
+    def test_template_validation_tracks_file_changes(self, tmp_path):
+        """Test cached validation is refreshed when the template file changes"""
+        import openpyxl
+        from excel_writer import validate_template_structure
+
+        path = tmp_path / 'template.xlsx'
+        wb = openpyxl.Workbook()
+        wb.active['A1'] = 'Revenues'
+        wb.save(path)
+        is_valid, issues = validate_template_structure(str(path))
+        assert not is_valid
+        issues.clear()
+        assert validate_template_structure(str(path))[1]
+
+        for row, label in enumerate(['Revenues', 'Cost of Goods Sold', 'Cash', 'Accounts Payable',
+                                     'Common Stock and Additional Paid-In Capital'], start=1):
+            wb.active.cell(row, 1).value = label
+        wb.save(path)
+        os.utime(path, (0, 0))
+
+        assert validate_template_structure(str(path)) == (True, [])
+
+    def test_template_load_errors_are_not_cached(self, tmp_path, monkeypatch):
+        """Test a failed template load is retried on the next call"""
+        import openpyxl
+        import excel_writer
+
+        path = tmp_path / 'template.xlsx'
+        wb = openpyxl.Workbook()
+        wb.active['A1'] = 'Revenues'
+        wb.save(path)
+
+        real_load = openpyxl.load_workbook
+        def locked(*args, **kwargs):
+            raise PermissionError('file is locked')
+        monkeypatch.setattr(excel_writer.openpyxl, 'load_workbook', locked)
+        is_valid, issues = excel_writer.validate_template_structure(str(path))
+        assert not is_valid
+        assert issues == ['Error loading template: file is locked']
+
+        monkeypatch.setattr(excel_writer.openpyxl, 'load_workbook', real_load)
+        is_valid, issues = excel_writer.validate_template_structure(str(path))
+        assert not is_valid
+        assert 'Error loading template' not in ' '.join(issues)
+
+    def test_template_without_dimension_tag(self, tmp_path):
+        """Test writing through a template whose sheets lack a <dimension> tag"""
+        import io
+        import re
+        import zipfile
+        import openpyxl
+        from excel_writer import write_financial_data_to_template
+        from sample_data import get_template_path
+
+        path = tmp_path / 'no_dimension.xlsx'
+        with zipfile.ZipFile(get_template_path('zero')) as src, \
+                zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                content = src.read(info.filename)
+                if info.filename.startswith('xl/worksheets/'):
+                    content = re.sub(rb'<dimension[^>]*/>', b'', content)
+                dst.writestr(info, content)
+
+        data = {2020: {'revenue': 100.0}, 2021: {'revenue': 250.0}}
+        output = write_financial_data_to_template(str(path), data)
+
+        ws = openpyxl.load_workbook(io.BytesIO(output.getvalue())).active
+        assert ws['B2'].value == 2020
+        assert 250 in [cell.value for row in ws.iter_rows() for cell in row]
+
+
+class TestRuleBasedSummary:
+    """Test rule-based summary generation"""
+    
+    def _financial_data(self):
+        return {
+            2023: {'revenue': 1000, 'cogs': 400, 'marketing_admin': 200,
+                   'interest_expense': 50, 'tax_expense': 50,
+                   'cash': 500, 'accounts_payable': 200, 'common_stock': 300},
+            2024: {'revenue': 1200, 'cogs': 480, 'marketing_admin': 220,
+                   'interest_expense': 50, 'tax_expense': 60,
+                   'cash': 600, 'accounts_payable': 250, 'common_stock': 350,
+                   'delta_ap': 50, 'capex': -100, 'dividends': 20},
+        }
+    
+    def test_income_statement_and_trend(self):
+        """Test margins and growth figures"""
+        summary = generate_rule_based_summary(self._financial_data())
+        
+        assert "Revenue: $1,200" in summary
+        assert "Gross Margin: 60.0%" in summary
+        assert "Net Margin: 32.5%" in summary
+        assert "Revenue Growth: +20.0%" in summary
+        assert "Net Income Growth: +30.0%" in summary
+        assert "✓ Strong profitability with healthy margins" in summary
+    
+    def test_balance_sheet_and_cash_flow(self):
+        """Test balance sheet totals and cash flow figures"""
+        summary = generate_rule_based_summary(self._financial_data())
+        
+        assert "Total Assets: $600" in summary
+        assert "Debt-to-Equity Ratio: 0.71x" in summary
+        assert "Operating Cash Flow: $440" in summary
+        assert "Investing Cash Flow: $-100" in summary
+        assert "Financing Cash Flow: $-20" in summary
+    
+    def test_missing_statements_noted(self):
+        """Test notes when balance sheet / cash flow are unavailable"""
+        summary = generate_rule_based_summary(self._financial_data(),
+                                              has_balance_sheet=False,
+                                              has_cash_flow=False)
+        
+        assert "BALANCE SHEET" not in summary
+        assert "CASH FLOW (" not in summary
+        assert "Balance Sheet data unavailable" in summary
+    
+    def test_summary_memoized_on_inputs(self):
+        """Test repeated calls reuse the cached summary but changed data does not"""
+        data = self._financial_data()
+        first = generate_rule_based_summary(data)
+        
+        assert generate_rule_based_summary(data) is first
+        
+        data[2024]['revenue'] = 2400
+        assert "Revenue: $2,400" in generate_rule_based_summary(data)
+    
+    def test_ai_summary_skips_api_without_data(self):
+        """Test empty data falls back to rule-based without calling the API"""
+        summary, used_ai = generate_ai_summary({}, api_key='test-key')
+        
+        assert not used_ai
+        assert "AI summary unavailable" not in summary
+        assert "Generated by Rule-Based Analysis Engine" in summary
+    
+    def test_matrix_and_scalar_paths_agree(self):
+        """Test the long-history matrix path matches the per-year scalar path"""
+        from ai_summary import INPUT_KEYS, _ZeroDict, _derive, _derive_years
+        
+        rng = np.random.default_rng(0)
+        data = {2000 + i: {k: float(v) for k, v in zip(INPUT_KEYS, rng.normal(1000, 500, len(INPUT_KEYS)))}
+                for i in range(12)}
+        data[2005]['revenue'] = 0.0
+        
+        derived = _derive_years(data, sorted(data))
+        
+        for year, values in data.items():
+            assert np.allclose(derived[year], _derive(_ZeroDict(values)))
+
+
+class TestPdfTables:
+    """Test PDF statement table contents"""
+
+    def test_income_statement_totals(self):
+        """Test derived totals are rendered and need revenue/COGS"""
+        pytest.importorskip('reportlab')
+        from pdf_export import create_income_statement_table
+
+        data = {
+            2023: {'revenue': 1000, 'cogs': 400, 'marketing_admin': 100,
+                   'interest_expense': 50, 'tax_expense': 100},
+            2024: {'cogs': 400},
+        }
+
+        rows = {row[0]: row[1:] for row in create_income_statement_table(data, [2023, 2024])._cellvalues}
+
+        assert rows['Gross Profit'] == ['600.0', '—']
+        assert rows['Total Operating Expenses'] == ['100.0', '0.0']
+        assert rows['Net Income'] == ['350.0', '—']
+
+    def test_total_rows_are_bold(self):
+        """Test every tagged total row, and no other data row, is bolded"""
+        pytest.importorskip('reportlab')
+        from pdf_export import CF_LINE_ITEMS, _CF_TABLE_STYLE
+
+        bold_rows = {cmd[1][1] for cmd in _CF_TABLE_STYLE.getCommands()
+                     if cmd[0] == 'FONTNAME' and cmd[3] == 'Helvetica-Bold' and cmd[1][1] > 0}
+
+        assert {CF_LINE_ITEMS[row - 1][0] for row in bold_rows} == {
+            'Cash from Operating Activities',
+            'Cash from Investing Activities',
+            'Cash from Financing Activities',
+        }
+
+    def test_async_build_report(self):
+        """Test the background build returns the same report as a direct build"""
+        pytest.importorskip('reportlab')
+        from pdf_export import async_build_report, create_pdf_report
+
+        data = {2023: {'revenue': 1000, 'cogs': 400, 'cash': 250}}
+
+        future = async_build_report(data, ai_summary='Summary', compress=False)
+        pdf = future.result(timeout=30).getvalue()
+
+        assert pdf.startswith(b'%PDF')
+        assert pdf.count(b'/Type /Page\n') == create_pdf_report(data, 'Summary', compress=False).getvalue().count(b'/Type /Page\n')
+
+    def test_repeat_report_reuses_build(self):
+        """Test identical inputs reuse the built report and changed data rebuilds it"""
+        pytest.importorskip('reportlab')
+        from pdf_export import create_pdf_report
+
+        data = {2023: {'revenue': 1000, 'cogs': 400}}
+
+        first = create_pdf_report(data, 'Summary')
+        built = first.getvalue()
+        first.write(b'garbage')
+        second = create_pdf_report(data, 'Summary')
+        data[2023]['revenue'] = 2000
+        third = create_pdf_report(data, 'Summary')
+
+        assert second.getvalue() == built
+        assert third.getvalue() != built
+    
+    def test_report_cache_respects_years(self):
+        """Test a different years argument builds a different report"""
+        pytest.importorskip('reportlab')
+        from pdf_export import create_pdf_report
+
+        data = {year: {'revenue': 1000.0 * (year - 2019), 'cogs': 400.0} for year in (2020, 2021, 2022, 2023)}
+
+        all_years = create_pdf_report(data, years=(2020, 2021, 2022, 2023)).getvalue()
+        fewer_years = create_pdf_report(data, years=(2021, 2022, 2023)).getvalue()
+
+        assert fewer_years != all_years
+
+
+class TestSampleData:
+    """Test backup sample pack loading"""
+
+    def test_loaded_frames_are_independent(self):
+        """Test cached packs hand each caller its own copy"""
+        from sample_data import list_backup_sets, load_backup_set
+
+        start_year, end_year = list_backup_sets()[0]
+        tb_df, _, _ = load_backup_set(start_year, end_year)
+        tb_df['Debit'] = 0.0
+
+        reloaded, _, _ = load_backup_set(start_year, end_year)
+
+        assert reloaded['Debit'].sum() > 0
+
+    def test_asset_lookup_is_remembered(self, tmp_path, monkeypatch):
+        """Test a resolved asset keeps its path and is re-checked on the next lookup"""
+        import sample_data
+
+        first, second = tmp_path / 'first', tmp_path / 'second'
+        for directory in (first, second):
+            directory.mkdir()
+            (directory / 'pack.csv').write_text(directory.name)
+        monkeypatch.setattr(sample_data, '_asset_dirs', lambda folder: [str(first), str(second)])
+        monkeypatch.setattr(sample_data, '_RESOLVED_PATHS', {})
+
+        assert sample_data._resolve_asset('pack.csv', 'sample_data') == str(first / 'pack.csv')
+
+        checked = []
+        real_exists = os.path.exists
+        monkeypatch.setattr(sample_data.os.path, 'exists', lambda path: checked.append(path) or real_exists(path))
+        assert sample_data._resolve_asset('pack.csv', 'sample_data') == str(first / 'pack.csv')
+        assert checked == [str(first / 'pack.csv')]
+
+        (first / 'pack.csv').unlink()
+        assert sample_data._resolve_asset('pack.csv', 'sample_data') == str(second / 'pack.csv')
+        assert sample_data._resolve_asset('missing.csv', 'sample_data') is None
+
+
 # Run tests if executed directly
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
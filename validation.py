@@ -131,6 +131,22 @@ def _tolerance(max_amount: float, tolerance_abs: float, tolerance_rel: float) ->
     return float(max(tolerance_abs, max_amount * tolerance_rel))
 
 
+def _first_present(s: pd.Series):
+    """
+    First non-null value of a column, or None when no value is truthy.
+
+    One notna() scan; the truthiness check only scans the column when the first
+    value is itself falsy (e.g. an empty string).
+    """
+    mask = s.notna().to_numpy()
+    if not mask.any():
+        return None
+    first = s.iat[int(mask.argmax())]
+    if first or s[mask].any():
+        return first
+    return None
+
+
 # -----------------------------
 # TB validation
 # -----------------------------
@@ -539,24 +555,19 @@ def apply_auto_fixes(df: pd.DataFrame, selected_fixes: List[str]) -> Tuple[pd.Da
             grp["Diff"] = grp["Debit"] - grp["Credit"]
             unb = grp[grp["Diff"].abs() > 0.01]
             if len(unb) > 0:
-                rows_to_add = []
-                for _, r in unb.iterrows():
-                    tid = r["TransactionID"]
-                    diff = float(r["Diff"])
-                    sample = txn_df[txn_df["TransactionID"]==tid].head(1)
-                    base_row = sample.iloc[0].to_dict() if len(sample)>0 else {}
-                    base_row["AccountNumber"] = 9999
-                    base_row["AccountName"] = "Suspense - Auto Balance"
-                    # add opposite side to make the transaction net to zero
-                    if diff > 0:
-                        base_row["Debit"] = 0.0
-                        base_row["Credit"] = diff
-                    else:
-                        base_row["Debit"] = -diff
-                        base_row["Credit"] = 0.0
-                    base_row["Description"] = f"Auto-balance transaction {tid} to suspense"
-                    rows_to_add.append(base_row)
-                df = pd.concat([df, pd.DataFrame(rows_to_add)], ignore_index=True)
+                # One balancing line per unbalanced transaction, based on its first line
+                first_lines = txn_df.drop_duplicates("TransactionID").set_index("TransactionID")
+                to_add = first_lines.loc[unb["TransactionID"]].reset_index()
+                diff = unb["Diff"].to_numpy(dtype=float)
+                to_add["AccountNumber"] = 9999
+                to_add["AccountName"] = "Suspense - Auto Balance"
+                # add opposite side to make the transaction net to zero
+                to_add["Debit"] = np.where(diff > 0, 0.0, -diff)
+                to_add["Credit"] = np.where(diff > 0, diff, 0.0)
+                to_add["Description"] = [f"Auto-balance transaction {tid} to suspense" for tid in unb["TransactionID"]]
+                # Keep the ledger's column order (set_index/reset_index moved TransactionID first)
+                new_cols = [c for c in to_add.columns if c not in txn_df.columns]
+                df = pd.concat([df, to_add[list(txn_df.columns) + new_cols]], ignore_index=True)
                 changes.append(f"Added {len(unb)} suspense line(s) to auto-balance unbalanced transactions")
 
     # balance_gl_overall (add one balancing line to Suspense to make total debits == credits)
@@ -576,8 +587,8 @@ def apply_auto_fixes(df: pd.DataFrame, selected_fixes: List[str]) -> Tuple[pd.Da
                 "AccountName": "Suspense - Auto Balance",
                 "Debit": 0.0,
                 "Credit": 0.0,
-                "Currency": df["Currency"].dropna().iloc[0] if "Currency" in df.columns and df["Currency"].dropna().any() else None,
-                "PeriodEnd": df["PeriodEnd"].dropna().iloc[0] if "PeriodEnd" in df.columns and df["PeriodEnd"].dropna().any() else None,
+                "Currency": _first_present(df["Currency"]) if "Currency" in df.columns else None,
+                "PeriodEnd": _first_present(df["PeriodEnd"]) if "PeriodEnd" in df.columns else None,
                 "Description": "Auto-balance overall GL to suspense",
             }
             if diff > 0: